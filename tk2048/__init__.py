@@ -26,4 +26,8 @@
 
 import os
 
+# where we were launched from, before moving to the package dir;
+# command-line tools resolve user given paths against it
+LAUNCH_DIR = os.getcwd()
+
 os.chdir(os.path.dirname(os.path.realpath(__file__)))
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+# headless throughput benchmarks, as a regression baseline:
+#
+#   python -m tk2048.benchmark --output baseline.json
+#
+# every run uses the same seeded boards, so two reports taken
+# before and after a change compare the same work
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from . import LAUNCH_DIR
+from . import simulate
+from .src import game2048_ai as GA
+from .src import game2048_bitboard as BB
+from .src import game2048_board as GB
+from .src import game2048_random as GR
+from .src.game2048_board import DIRECTIONS
+
+
+def random_boards(count, seed):
+    """
+        returns @count bitboards reached by random play from @seed,
+        so that positions look like real games (both early and late
+        ones) rather than random nibbles;
+    """
+    _rng = GR.Game2048Random(seed)
+    _boards = []
+    _board = GB.Game2048Board(rng=_rng.fork())
+    while len(_boards) < count:
+        if _board.no_more_hints() or _board.empty_count == 16:
+            _board.reset_board()
+            for _n in range(2):
+                _board.pop_tile()
+            # end for
+        # end if
+        if _board.move(_rng.choice(DIRECTIONS)):
+            _board.pop_tile()
+            _boards.append(_board.bitboard)
+        # end if
+    # end while
+    return _boards
+# end def
+
+
+def _board_objects(bitboards, seed):
+    _rng = GR.Game2048Random(seed)
+    _boards = []
+    for _bitboard in bitboards:
+        _board = GB.Game2048Board(rng=_rng.fork(len(_boards)))
+        _board.set_bitboard(_bitboard)
+        _boards.append(_board)
+    # end for
+    return _boards
+# end def
+
+
+def _rate(count, elapsed):
+    return round(count / elapsed, 1) if elapsed > 0 else None
+# end def
+
+
+def bench_moves(bitboards, seed, rounds):
+    _results = dict()
+    for _direction in DIRECTIONS:
+        _count = 0
+        _elapsed = 0.0
+        for _round in range(rounds):
+            # fresh copies each round, moves change the boards
+            _boards = _board_objects(bitboards, seed)
+            _started = time.perf_counter()
+            for _board in _boards:
+                _board.move(_direction)
+            # end for
+            _elapsed += time.perf_counter() - _started
+            _count += len(_boards)
+        # end for
+        _results["move_{}_per_sec".format(_direction)] = (
+            _rate(_count, _elapsed)
+        )
+        _started = time.perf_counter()
+        for _round in range(rounds):
+            for _bitboard in bitboards:
+                BB.move(_bitboard, _direction)
+            # end for
+        # end for
+        _results["bitboard_move_{}_per_sec".format(_direction)] = _rate(
+            rounds * len(bitboards), time.perf_counter() - _started
+        )
+    # end for
+    return _results
+# end def
+
+
+def bench_spawns(bitboards, seed, rounds):
+    _count = 0
+    _elapsed = 0.0
+    for _round in range(rounds):
+        _boards = [
+            _board for _board in _board_objects(bitboards, seed + _round)
+            if not _board.is_full()
+        ]
+        _started = time.perf_counter()
+        for _board in _boards:
+            _board.pop_tile()
+        # end for
+        _elapsed += time.perf_counter() - _started
+        _count += len(_boards)
+    # end for
+    return dict(spawns_per_sec=_rate(_count, _elapsed))
+# end def
+
+
+def bench_game_over(bitboards, seed, rounds):
+    _boards = _board_objects(bitboards, seed)
+    _started = time.perf_counter()
+    for _round in range(rounds):
+        for _board in _boards:
+            _board.no_more_hints()
+        # end for
+    # end for
+    return dict(
+        game_over_checks_per_sec=_rate(
+            rounds * len(_boards), time.perf_counter() - _started
+        )
+    )
+# end def
+
+
+def bench_evaluate(bitboards, rounds):
+    # touch every table page first: steady state is what searches see
+    for _bitboard in bitboards:
+        GA.evaluate(_bitboard)
+    # end for
+    _started = time.perf_counter()
+    for _round in range(rounds):
+        for _bitboard in bitboards:
+            GA.evaluate(_bitboard)
+        # end for
+    # end for
+    return dict(
+        evaluations_per_sec=_rate(
+            rounds * len(bitboards), time.perf_counter() - _started
+        )
+    )
+# end def
+
+
+def bench_search(bitboards, depth, positions):
+    _player = GA.Game2048Expectimax(depth=depth, time_budget=None)
+    _started = time.perf_counter()
+    for _bitboard in bitboards[:positions]:
+        if _player.cache is not None:
+            _player.cache.clear()
+        # end if
+        _player.search_root(_bitboard, depth)
+    # end for
+    _elapsed = time.perf_counter() - _started
+    return dict(
+        search_depth=depth,
+        search_positions=min(positions, len(bitboards)),
+        search_nodes=_player.nodes,
+        search_nodes_per_sec=_rate(_player.nodes, _elapsed),
+    )
+# end def
+
+
+def bench_games(seed, games, depth):
+    # headless expectimax games: the rules player (AI_PLAYER "rules")
+    # is part of the Tk window and can not run here
+    _moves = 0
+    _started = time.perf_counter()
+    for _game in range(games):
+        _result = simulate.play_game(
+            (_game, seed + _game, False, dict(depth=depth))
+        )
+        _moves += _result["moves"]
+    # end for
+    _elapsed = time.perf_counter() - _started
+    return dict(
+        games=games,
+        game_player="expectimax",
+        game_depth=depth,
+        game_moves=_moves,
+        games_per_sec=_rate(games, _elapsed),
+        game_moves_per_sec=_rate(_moves, _elapsed),
+    )
+# end def
+
+
+def run(args):
+    _boards = random_boards(args.boards, args.seed)
+    _report = dict(
+        benchmark="tk2048",
+        seed=args.seed,
+        boards=args.boards,
+        rounds=args.rounds,
+        python=platform.python_version(),
+        implementation=platform.python_implementation(),
+        machine=platform.machine(),
+        results=dict(),
+    )
+    _results = _report["results"]
+    _results.update(bench_moves(_boards, args.seed, args.rounds))
+    _results.update(bench_spawns(_boards, args.seed, args.rounds))
+    _results.update(bench_game_over(_boards, args.seed, args.rounds))
+    _results.update(bench_evaluate(_boards, args.rounds))
+    _results.update(
+        bench_search(_boards, args.search_depth, args.search_positions)
+    )
+    if args.games:
+        _results.update(bench_games(args.seed, args.games, args.game_depth))
+    # end if
+    return _report
+# end def
+
+
+def parse_args(argv=None):
+    _parser = argparse.ArgumentParser(
+        prog="python -m tk2048.benchmark",
+        description="Measure headless 2048 engine and AI throughput.",
+    )
+    _parser.add_argument(
+        "--seed", type=int, default=2048,
+        help="seed of boards, spawns and games (default: 2048)",
+    )
+    _parser.add_argument(
+        "--boards", type=int, default=2000,
+        help="random-play positions to benchmark on",
+    )
+    _parser.add_argument(
+        "--rounds", type=int, default=5,
+        help="passes over the positions per micro benchmark",
+    )
+    _parser.add_argument(
+        "--search-depth", type=int, default=2,
+        help="fixed expectimax depth for the nodes/sec benchmark",
+    )
+    _parser.add_argument(
+        "--search-positions", type=int, default=50,
+        help="positions searched for the nodes/sec benchmark",
+    )
+    _parser.add_argument(
+        "--games", type=int, default=3,
+        help="full games played by the expectimax AI, 0 to skip",
+    )
+    _parser.add_argument(
+        "--game-depth", type=int, default=1,
+        help="expectimax depth for full games",
+    )
+    _parser.add_argument(
+        "--output", default="-",
+        help="JSON report file, '-' for stdout (default)",
+    )
+    return _parser.parse_args(argv)
+# end def
+
+
+def main(argv=None):
+    _args = parse_args(argv)
+    _text = json.dumps(run(_args), indent=2, sort_keys=True) + "\n"
+    if _args.output == "-":
+        sys.stdout.write(_text)
+    else:
+        with open(os.path.join(LAUNCH_DIR, _args.output), "w") as _file:
+            _file.write(_text)
+        # end with
+    # end if
+    return 0
+# end def
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+# end if
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+# (re)builds the memory-mapped lookup table cache ahead of time:
+#
+#   python -m tk2048.build_tables [--force]
+#
+# tables are also built on first use, and again whenever the code
+# that builds them changes (see game2048_tables.code_version);
+# running this once at install time keeps the first launch fast too
+
+import argparse
+import json
+import os
+import sys
+
+from .src import game2048_bitboard as BB
+from .src import game2048_eval as GE
+from .src import game2048_ntuple as GN
+from .src import game2048_tables as GT
+
+
+def parse_args(argv=None):
+    _parser = argparse.ArgumentParser(
+        prog="python -m tk2048.build_tables",
+        description="Build the tk2048 lookup table cache.",
+    )
+    _parser.add_argument(
+        "--force", action="store_true",
+        help="rebuild tables even if they are up to date",
+    )
+    return _parser.parse_args(argv)
+# end def
+
+
+def main(argv=None):
+    _args = parse_args(argv)
+    BB.load_tables(force=_args.force)
+    GE.load_distinct(force=_args.force)
+    GE.load_tables(GE.WEIGHTS, force=_args.force)
+    for _tuples in (GN.TUPLES_4, GN.TUPLES_6):
+        GN.load_tables(_tuples, force=_args.force)
+    # end for
+    _dir = GT.cache_dir()
+    _files = sorted(
+        _name for _name in os.listdir(_dir) if _name.endswith(".tbl")
+    ) if os.path.isdir(_dir) else []
+    sys.stdout.write(json.dumps(dict(
+        cache_dir=_dir,
+        format_version=GT.FORMAT_VERSION,
+        files={
+            _name: os.path.getsize(os.path.join(_dir, _name))
+            for _name in _files
+        },
+    ), indent=2) + "\n")
+    return 0
+# end def
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+# end if
@@ -24,7 +24,6 @@
     If not, see http://www.gnu.org/licenses/
 """
 
-import random
 import time
 
 try:
@@ -37,6 +36,16 @@ except:
     from tkinter import messagebox
 # end try
 
+from src import game2048_ai as GA
+from src import game2048_autoplay as GP
+from src import game2048_bitboard as BB
+from src import game2048_eval as GE
+from src import game2048_log as GL
+from src import game2048_montecarlo as GMC
+from src import game2048_ntuple as GN
+from src import game2048_parallel as GPX
+from src import game2048_random as GR
+from src import game2048_replay as GRP
 from src import game2048_score as GS
 from src import game2048_grid as GG
 
@@ -45,11 +54,23 @@ class GabrieleCirulli2048 (tk.Tk):
 
     PADDING =10#边界大小
     START_TILES = 2#初始数据量
+    # "expectimax", "parallel", "montecarlo", "ntuple" or "rules"
+    AI_PLAYER = "expectimax"
+    AI_DEPTH = 3
+    AI_TIME_BUDGET = 0.1        # seconds of search per move
+    AI_WEIGHTS = None           # game2048_eval.WEIGHTS overrides, a dict
+    AI_WORKERS = None           # "parallel" processes, None: one per CPU
+    AI_PLAYOUTS = 100           # "montecarlo" playouts per legal move
+    AI_NTUPLE_FILE = "ntuple.bin"   # "ntuple" network, see tk2048.train
+    AI_MOVES_PER_SECOND = None  # None means as fast as possible
+    SEED = None                 # None means a fresh seed for each game
+    REPLAY_FILE = None          # binary replay file games get appended to
+    LOG_LEVEL = None            # e.g. "debug" for per-move records
+    LOG_SAMPLE_EVERY = 1        # log one move out of this many
+    LOG_MAX_PER_SECOND = 20     # logged moves per second at most
 
     def __init__(self, **kw):#这是构造函数
         tk.Tk.__init__(self)#初始化GUI
-        for k, v in kw:
-            print("Key = {}, value = {}".format(k, v))
         self.initialize(**kw)
     # end def
 
@@ -91,22 +112,97 @@ class GabrieleCirulli2048 (tk.Tk):
             self, text="AI Game", command=self.ai_new_game,
         ).pack(side=tk.RIGHT)
         self.grid.set_score_callback(self.update_score)
+        self.seed = kw.get("seed", self.SEED)
+        GL.configure(kw.get("log_level", self.LOG_LEVEL))
+        for _key, _value in kw.items():
+            GL.logger.info("option %s = %r", _key, _value)
+        # end for
+        self.move_log = GL.Game2048MoveLog(
+            sample_every=kw.get("log_sample_every", self.LOG_SAMPLE_EVERY),
+            max_per_second=kw.get(
+                "log_max_per_second", self.LOG_MAX_PER_SECOND
+            ),
+        )
+        self.recorder = None
+        _replay_file = kw.get("replay_file", self.REPLAY_FILE)
+        if _replay_file:
+            self.recorder = GRP.Game2048Recorder(open(_replay_file, "ab"))
+            self.grid.board.recorder = self.recorder
+        # end if
+        _weights = kw.get("ai_weights", self.AI_WEIGHTS)
+        if self.AI_PLAYER == "parallel":
+            self.ai = GPX.Game2048ParallelExpectimax(
+                depth=kw.get("ai_depth", self.AI_DEPTH),
+                time_budget=kw.get("ai_time_budget", self.AI_TIME_BUDGET),
+                workers=kw.get("ai_workers", self.AI_WORKERS),
+                evaluator=(
+                    GE.Game2048Evaluator(**_weights) if _weights else None
+                ),
+            )
+        elif self.AI_PLAYER == "montecarlo":
+            self.ai = GMC.Game2048MonteCarlo(
+                playouts=kw.get("ai_playouts", self.AI_PLAYOUTS),
+            )
+        elif self.AI_PLAYER == "ntuple":
+            # expectimax over the trained network's afterstate values
+            self.network = GN.Game2048NTuple.open(
+                kw.get("ai_ntuple_file", self.AI_NTUPLE_FILE)
+            )
+            self.ai = GA.Game2048Expectimax(
+                depth=kw.get("ai_depth", self.AI_DEPTH),
+                time_budget=kw.get("ai_time_budget", self.AI_TIME_BUDGET),
+                evaluator=self.network.evaluate, afterstates=True,
+            )
+        else:
+            self.ai = GA.Game2048Expectimax(
+                depth=kw.get("ai_depth", self.AI_DEPTH),
+                time_budget=kw.get("ai_time_budget", self.AI_TIME_BUDGET),
+                evaluator=(
+                    GE.Game2048Evaluator(**_weights) if _weights else None
+                ),
+            )
+        # end if
+        self.autoplay = GP.Game2048Autoplay(
+            self.grid, self.ai,
+            moves_per_second=kw.get(
+                "ai_moves_per_second", self.AI_MOVES_PER_SECOND
+            ),
+        )
     # end def
 
     def new_game(self, *args, **kw):
+        self.autoplay.stop()
         self.unbind_all("<Key>")
         self.score.reset_score()
         self.grid.reset_grid()
+        self.seed_game(kw.get("seed", self.seed))
+        _delays = self.grid.board.rng.fork()
         for n in range(self.START_TILES):
             self.after(
-                100 * random.randrange(3, 7), self.grid.pop_tile
+                100 * _delays.randrange(3, 7), self.grid.pop_tile
             )
         # end if
         self.bind_all("<Key>", self.on_keypressed)
     # end def
 
+    def seed_game(self, seed=None):
+        # same seed, same tile spawns: log it to replay a game
+        self.grid.board.rng = GR.Game2048Random(seed)
+        GL.logger.info("game seed = %d", self.grid.board.rng.seed)
+        if self.recorder:
+            self.recorder.begin_game(self.grid.board)
+        # end if
+    # end def
+
     def quit_app(self, **kw):
         if messagebox.askokcancel("Question", "Quit game?"):
+            self.autoplay.close()
+            if self.AI_PLAYER == "parallel":
+                self.ai.close()
+            # end if
+            if self.recorder:
+                self.recorder.close()
+            # end if
             self.quit()
             self.destroy()
         # end if
@@ -133,16 +229,21 @@ class GabrieleCirulli2048 (tk.Tk):
             self.hint.pack_forget()
         except:
             pass
+        # end try
+        if self.move_log.begin_move():
+            self.move_log.record(
+                "key", key=tk_event.keysym, tiles=self.get_tile_list()
+            )
+        # end if
+    # end def
 
+    def get_tile_list(self):
+        # (id, row, column, value) of each tile, for log records
         tiles = self.grid.tiles
-        # print("tiles = {}".format(tiles))
-        for t in tiles:
-            print("Tile id = {}, tile row = {}, tile column = {}, value = {}".
-                  format(t, tiles[t].row, tiles[t].column, tiles[t].value))
-        print("--------------------------")
-        self.getmat()
-        print("--------------------------")
-        # end try
+        return [
+            (t, tiles[t].row, tiles[t].column, tiles[t].value)
+            for t in tiles
+        ]
     # end def
 
     def update_score(self, value, mode="add"):
@@ -155,16 +256,22 @@ class GabrieleCirulli2048 (tk.Tk):
     # end def
 
     def ai_new_game(self, *args, **kw):
+        self.autoplay.stop()
         self.unbind_all("<Key>")
         self.score.reset_score()
         self.grid.reset_grid()
-        for n in range(self.START_TILES):
-            self.after(
-                100 * random.randrange(3, 7), self.grid.pop_tile
-            )
-        # end if
+        self.seed_game(kw.get("seed", self.seed))
         self.playloops = 0
-        self.after(200, self.ai_pressed)  # 多长时间后调用下一次ai_pressed
+        # start tiles pop before the first AI move, not on a timer:
+        # a late pop would spawn mid-game, at a speed dependent move
+        if self.AI_PLAYER == "rules":
+            for n in range(self.START_TILES):
+                self.grid.pop_tile()
+            # end for
+            self.after(self.ai_delay(), self.ai_pressed)  # 多长时间后调用下一次ai_pressed
+        else:
+            self.autoplay.start(start_tiles=self.START_TILES)
+        # end if
         self.bind_all("<Key>", self.on_keypressed)
 
     # end def
@@ -177,11 +284,14 @@ class GabrieleCirulli2048 (tk.Tk):
 
         # get the values of cells
         tiles = self.grid.tiles
-        for t in tiles:
-            print("Tile id = {}, tile row = {}, tile column = {}, value = {}".
-                  format(t, tiles[t].row, tiles[t].column, tiles[t].value))
+        _log = self.move_log
+        if _log.begin_move():
+            _log.record("tiles", tiles=self.get_tile_list())
+        # end if
 ########################################################核心算法##############
-        mat= self.getmat()
+        # snapshot: the rules below read the board as it was when
+        # this step started, even after a realignment move
+        mat = [list(row) for row in self.getmat()]
         two=list()
         four=list()
         for t in tiles:
@@ -189,7 +299,6 @@ class GabrieleCirulli2048 (tk.Tk):
                 two.append(tiles[t])
             elif tiles[t].value==4:
                 four.append(tiles[t])
-        print("--------------------------")
 
 
         #lastlist1=copy.deepcopy(tiles)
@@ -206,13 +315,13 @@ class GabrieleCirulli2048 (tk.Tk):
         r4=self.getrowdifnum(3)
         r3=self.getrowdifnum(2)
         if r4==4 :
-            print("第四行满了")
+            _log.record("decision", reason="第四行满了")
             if r3<4 :
                 for i1 in range(0,r3):
                     if mat[3][i1]==mat[2][i1+4-r3]:
                         dold=True
                 if dold and mat[3][0]+mat[3][1]+mat[3][2]+mat[3][3]>200:                    
-                    print("错位整理")
+                    _log.record("decision", reason="错位整理")
                     self.grid.move_tiles_left()
                     #time.sleep(2)
                     self.grid.move_tiles_down()
@@ -222,71 +331,73 @@ class GabrieleCirulli2048 (tk.Tk):
         r3=self.getrowdifnum(2)
         r2=self.getrowdifnum(1)
         if r4==4 and r3==4:
-            print("前两行满了")
+            _log.record("decision", reason="前两行满了")
             if r2<4 :
                 for i1 in range(0,r2):
                     if mat[2][i1]==mat[1][i1+4-r2]:
                         dold=True
                 if dold:
-                    print("错位整理")
+                    _log.record("decision", reason="错位整理")
                     self.grid.move_tiles_left()
                     #time.sleep(2)
                     self.grid.move_tiles_down()
 
 #尽可能合并2/4
-        lastlist1=list()
-        newlist=list()
-        for t1 in tiles:
-            lastlist1.extend([t1, tiles[t1].row, tiles[t1].column, tiles[t1].value])
+        last = self.grid.fingerprint
 
         if len(two)>=2 and self.ai_candown(two):
-            print("Move down cause 2")
+            _log.record("decision", reason="Move down cause 2")
             self.grid.move_tiles_down()
         elif len(four)>=2 and self.ai_candown(four):
-            print("Move down cause 4")
+            _log.record("decision", reason="Move down cause 4")
             self.grid.move_tiles_down()
         elif len(two)>=2 and self.ai_canright(two):
-            print("Move right cause 2")
+            _log.record("decision", reason="Move right cause 2")
             self.grid.move_tiles_right()
         elif len(four)>=2 and self.ai_canright(four):
-            print("Move right cause 4")
+            _log.record("decision", reason="Move right cause 4")
             self.grid.move_tiles_right()
         else:#依次尝试下右左上
-            print("Try to move down")
-            self.grid.move_tiles_down()
-            for t2 in tiles:
-                newlist.extend([t2, tiles[t2].row, tiles[t2].column, tiles[t2].value])
-            #newlist=list(tiles)
-            if self.compare(lastlist1,newlist):#lastlist1==tiles:
-                print("Defeat and Try to move right")
+            # probe with peek_move(): only moves that act get played
+            _log.record("decision", reason="Try to move down")
+            if self.can_move("down"):
+                self.grid.move_tiles_down()
+            elif self.can_move("right"):
+                _log.record("decision", reason="Defeat and Try to move right")
                 self.grid.move_tiles_right()
-                newlist.clear()
-                for t3 in tiles:
-                    newlist.extend([t3, tiles[t3].row, tiles[t3].column, tiles[t3].value])
-                if self.compare(lastlist1,newlist):
-                    print("Defeat and Try to move left")
+            else:
+                _log.record("decision", reason="Defeat and Try to move left")
+                if self.can_move("left"):
                     self.grid.move_tiles_left()
-                    #time.sleep(0.2)
-                    print("Then try to move right")
+                #time.sleep(0.2)
+                _log.record("decision", reason="Then try to move right")
+                if self.can_move("right"):
                     self.grid.move_tiles_right()
-                    newlist.clear()
-                    for t4 in tiles:
-                        newlist.extend([t4, tiles[t4].row, tiles[t4].column, tiles[t4].value])
-                    if self.compare(lastlist1,newlist):
-                        print("Then try to move down")
+                # left then right may bring tiles back where they were
+                if self.grid.fingerprint == last:
+                    _log.record("decision", reason="Then try to move down")
+                    if self.can_move("up"):
                         self.grid.move_tiles_up()
-                        #time.sleep(0.2)
+                    #time.sleep(0.2)
+                    if self.can_move("down"):
                         self.grid.move_tiles_down()
 
         if self.grid.no_more_hints():  # game over
             # self.ai_new_game()  # play ai again
             pass
         else:
-            self.after(100, self.ai_pressed)  # ai press again after 200 ms
+            # same pacing as autoplay: AI_MOVES_PER_SECOND, if any
+            self.after(self.ai_delay(), self.ai_pressed)
+
+    def ai_delay(self):
+        # ms between two rules AI steps, 1 means as fast as possible
+        _rate = self.autoplay.moves_per_second
+        return max(1, int(1000 / _rate)) if _rate else 1
+    # end def
 
     def ai_candown(self,num):
         ins=False
-        tiles = self.grid.tiles
+        cells = self.grid.cells
         val= num[0].value
         for i in range(0,len(num)-1):
             for k in range(i+1,len(num)):
@@ -294,21 +405,13 @@ class GabrieleCirulli2048 (tk.Tk):
                     if num[i].row==num[k].row+1 or num[i].row==num[k].row-1 :#上下挨着
                         return True
                     elif  num[i].row==num[k].row+2 or num[i].row==num[k].row-2 :#上下隔一个
-                        ins=False
-                        for t in tiles:#看看有没有块在两个中间
-                            if (tiles[t].column)==(num[i].column) and (tiles[t].row)==(num[i].row+num[k].row)/2:
-                                ins=True
+                        #看看有没有块在两个中间
+                        ins=bool(cells[(num[i].row+num[k].row)//2][num[i].column])
                         if ins==False:
                             return True
                     elif num[i].row==num[k].row+3 or num[i].row==num[k].row-3:#上下隔两个
-                        #print("1")
-                        ins=False
-                        for t in tiles:#看看有没有块在两个中间
-                            if (tiles[t].column)==(num[i].column):
-                                if tiles[t].row==2 or tiles[t].row==3:
-                                    ins=True
-                                #print("2")
-
+                        #看看有没有块在两个中间
+                        ins=bool(cells[2][num[i].column] or cells[3][num[i].column])
                         if ins==False:
                             #print("3")
                             return True
@@ -318,7 +421,7 @@ class GabrieleCirulli2048 (tk.Tk):
         #end ai_candown
     def ai_canright(self,num):
         ins=False
-        tiles = self.grid.tiles
+        cells = self.grid.cells
         val= num[0].value
         for i in range(0,len(num)-1):
             for k in range(i+1,len(num)):
@@ -326,57 +429,33 @@ class GabrieleCirulli2048 (tk.Tk):
                     if num[i].column==num[k].column+1 or num[i].column==num[k].column-1 :#上下挨着
                         return True
                     elif  num[i].column==num[k].column+2 or num[i].column==num[k].column-2 :#上下隔一个
-                        ins=False
-                        for t in tiles:#看看有没有块在两个中间
-                            if (tiles[t].row)==(num[i].row) and (tiles[t].column)==(num[i].column+num[k].column)/2:
-                                ins=True
+                        #看看有没有块在两个中间
+                        ins=bool(cells[num[i].row][(num[i].column+num[k].column)//2])
                         if ins==False:
                             return True
                     elif num[i].column==num[k].column+3 or num[i].column==num[k].column-3:#上下隔两个
-                        ins=False
-                        for t in tiles:#看看有没有块在两个中间
-                            if (tiles[t].row)==(num[i].row):
-                                if tiles[t].column==2 or tiles[t].column==3:
-                                    ins=True
-
+                        #看看有没有块在两个中间
+                        ins=bool(cells[num[i].row][2] or cells[num[i].row][3])
                         if ins==False:
                             return True
                     else:
                         pass
         return False
         #end ai_candown
-    def compare(self,a1,b1):
-        #tiles = self.grid.tiles
-        if len(a1)==len(b1):
-            #print("{0}{1}".format(len(a2),len(b2)))
-            for i in range(0,len(a1)):
-                #print(a2,b2)
-                #print("{0}{1}".format(a1[i].id,b1[i].id))
-                if a1[i]!=b1[i]:
-                    return False
-            return True
-        else:
-            return False
+    def can_move(self, direction):
+        # side-effect free: nothing moves, spawns or gets drawn
+        if self.grid.board.saturated:
+            # tiles above 32768: capped bitboard ranks may lie
+            return bool(
+                self.grid.board.legal_moves() & BB.DIRECTION_BITS[direction]
+            )
+        return BB.peek_move(self.grid.fingerprint, direction)[2]
     def getmat(self):
-        tiles = self.grid.tiles
-        mat=[[0]*4,[0]*4,[0]*4,[0]*4]
-        for t in tiles:
-            mat[tiles[t].row][tiles[t].column]=tiles[t].value
-        #print(mat)
-        return mat
+        # the grid's live value matrix, no copy: do not modify it
+        return self.grid.cells
     def getrowdifnum(self,r):
-        mat=self.getmat()
-        num=0
-        mylist=list()
-        for i in range(0,4):
-            if mat[r][i]!=0:
-                num+=1
-                mylist.append(i)
-        if num>=2:
-            for k in range(0,len(mylist)-1):
-                if mat[r][mylist[k]]==mat[r][mylist[k+1]]:
-                    num-=1
-        return num
+        # tiles in row r, minus neighbour pairs that would fuse
+        return GE.ROW_DISTINCT[(self.grid.fingerprint >> (16 * r)) & 0xFFFF]
 
 
 
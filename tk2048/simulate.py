@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+# headless batch self-play, no display needed:
+#
+#   python -m tk2048.simulate --games 100 --workers 8 --seed 1 \
+#       --output results.jsonl --replay games.rpl
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from . import LAUNCH_DIR
+from .src import game2048_ai as GA
+from .src import game2048_board as GB
+from .src import game2048_montecarlo as GMC
+from .src import game2048_ntuple as GN
+from .src import game2048_random as GR
+from .src import game2048_replay as GRP
+
+
+FIELDS = ("game", "seed", "score", "max_tile", "moves", "wall_time")
+
+# n-tuple networks already mapped by this process, by file path
+_networks = dict()
+
+
+def make_player(options, seed):
+    """
+        AI player for @options, a dict of "player" (expectimax,
+        montecarlo or ntuple), "depth", "time_budget", "playouts"
+        and "weights";
+    """
+    _name = options.get("player", "expectimax")
+    if _name == "montecarlo":
+        return GMC.Game2048MonteCarlo(
+            playouts=options.get("playouts") or
+            GMC.Game2048MonteCarlo.PLAYOUTS,
+            seed=seed,
+        )
+    # end if
+    _evaluator = None
+    if _name == "ntuple":
+        _path = options["weights"]
+        if _path not in _networks:
+            _networks[_path] = GN.Game2048NTuple.open(_path)
+        # end if
+        _evaluator = _networks[_path].evaluate
+    # end if
+    # networks value afterstates, see game2048_ntuple
+    return GA.Game2048Expectimax(
+        depth=options.get("depth", 2),
+        time_budget=options.get("time_budget"),
+        evaluator=_evaluator, afterstates=_name == "ntuple",
+    )
+# end def
+
+
+def play_game(task):
+    _game, _seed, _record, _options = task
+    _board = GB.Game2048Board(rng=GR.Game2048Random(_seed))
+    _player = make_player(_options, _seed)
+    if _record:
+        # records go back to the parent process, which owns the file
+        _replay = io.BytesIO()
+        _board.recorder = GRP.Game2048Recorder(_replay, header=False)
+        _board.recorder.begin_game(_board)
+    # end if
+    _started = time.perf_counter()
+    for _n in range(2):
+        _board.pop_tile()
+    # end for
+    _moves = 0
+    while True:
+        _direction = _player.get_move(_board.bitboard)
+        if not _direction:
+            break
+        # end if
+        _board.move(_direction)
+        _board.pop_tile()
+        _moves += 1
+    # end while
+    _result = dict(
+        game=_game,
+        seed=_seed,
+        score=_board.score,
+        max_tile=_board.max_value,
+        moves=_moves,
+        wall_time=round(time.perf_counter() - _started, 6),
+    )
+    if _record:
+        _board.recorder.end_game()
+        _result["replay"] = _replay.getvalue()
+    # end if
+    return _result
+# end def
+
+
+def iter_results(tasks, workers):
+    if workers <= 1:
+        for _task in tasks:
+            yield play_game(_task)
+        # end for
+    else:
+        with multiprocessing.Pool(workers) as _pool:
+            for _result in _pool.imap_unordered(play_game, tasks):
+                yield _result
+            # end for
+        # end with
+    # end if
+# end def
+
+
+class ResultWriter:
+
+    def __init__(self, stream, output_format):
+        self.stream = stream
+        self.output_format = output_format
+        self.__csv = None
+        if output_format == "csv":
+            self.__csv = csv.DictWriter(stream, fieldnames=FIELDS)
+            self.__csv.writeheader()
+        # end if
+    # end def
+
+    def write(self, result):
+        if self.__csv:
+            self.__csv.writerow(result)
+        else:
+            self.stream.write(json.dumps(result) + "\n")
+        # end if
+        self.stream.flush()
+    # end def
+
+# end class
+
+
+def parse_args(argv=None):
+    _parser = argparse.ArgumentParser(
+        prog="python -m tk2048.simulate",
+        description="Play headless 2048 games with an AI player.",
+    )
+    _parser.add_argument(
+        "--games", type=int, default=10, help="number of games to play",
+    )
+    _parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="worker processes (default: one per CPU)",
+    )
+    _parser.add_argument(
+        "--seed", type=int, default=0,
+        help="base seed, game #i is seeded with seed + i",
+    )
+    _parser.add_argument(
+        "--player", choices=("expectimax", "montecarlo", "ntuple"),
+        default="expectimax",
+        help="AI player (default: expectimax); ntuple is expectimax "
+             "over the --weights network's afterstate values",
+    )
+    _parser.add_argument(
+        "--depth", type=int, default=2, help="expectimax search depth",
+    )
+    _parser.add_argument(
+        "--playouts", type=int, default=GMC.Game2048MonteCarlo.PLAYOUTS,
+        help="montecarlo random playouts per legal move",
+    )
+    _parser.add_argument(
+        "--weights", default="ntuple.bin",
+        help="ntuple network file, see python -m tk2048.train",
+    )
+    _parser.add_argument(
+        "--time-budget", type=float, default=None,
+        help="seconds of search per move (default: no limit, which "
+             "keeps runs reproducible)",
+    )
+    _parser.add_argument(
+        "--output", default="-",
+        help="results file, '-' for stdout (default)",
+    )
+    _parser.add_argument(
+        "--replay", default=None,
+        help="also record every game to this binary replay file",
+    )
+    _parser.add_argument(
+        "--format", choices=("jsonl", "csv"), default=None,
+        help="output format (default: guessed from --output, else jsonl)",
+    )
+    return _parser.parse_args(argv)
+# end def
+
+
+def main(argv=None):
+    _args = parse_args(argv)
+    _format = _args.format
+    if not _format:
+        _format = "csv" if _args.output.endswith(".csv") else "jsonl"
+    # end if
+    _options = dict(
+        player=_args.player,
+        depth=_args.depth,
+        time_budget=_args.time_budget,
+        playouts=_args.playouts,
+        weights=os.path.join(LAUNCH_DIR, _args.weights),
+    )
+    _tasks = [
+        (_game, _args.seed + _game, bool(_args.replay), _options)
+        for _game in range(_args.games)
+    ]
+    if _args.output == "-":
+        _stream = sys.stdout
+    else:
+        _stream = open(
+            os.path.join(LAUNCH_DIR, _args.output), "w", newline=""
+        )
+    # end if
+    _replay = None
+    if _args.replay:
+        _replay = open(os.path.join(LAUNCH_DIR, _args.replay), "wb")
+        GRP.write_header(_replay)
+    # end if
+    try:
+        _writer = ResultWriter(_stream, _format)
+        for _result in iter_results(_tasks, _args.workers):
+            if _replay:
+                _replay.write(_result.pop("replay"))
+            # end if
+            _writer.write(_result)
+        # end for
+    finally:
+        if _stream is not sys.stdout:
+            _stream.close()
+        # end if
+        if _replay:
+            _replay.close()
+        # end if
+    # end try
+    return 0
+# end def
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+# end if
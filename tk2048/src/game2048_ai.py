@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import collections
+import time
+
+from . import game2048_bitboard as BB
+from . import game2048_eval as GE
+from .game2048_board import DIRECTIONS
+
+
+# spawn odds, same as Game2048Board.pop_tile(): choice([2, 4, 2, 2])
+SPAWN_ODDS = ((1, 0.75), (2, 0.25))     # (rank, probability)
+
+LOST_PENALTY = GE.LOST_PENALTY
+
+# default leaf evaluation, game2048_eval.WEIGHTS tables
+evaluate = GE.Game2048Evaluator().evaluate
+
+
+def empty_shifts(board):
+    return [
+        _shift for _shift in range(0, 64, 4)
+        if not (board >> _shift) & BB.CELL_MASK
+    ]
+# end def
+
+
+class SearchTimeout (Exception):
+    pass
+# end class
+
+
+class TranspositionTable:
+    """
+        bounded (board, depth) -> score cache of at most @max_entries
+        entries (a count, not bytes), least recently used entries are
+        evicted first;
+
+        only scores of whole subtrees are stored, along with the
+        probability they were searched at: a lookup at that
+        probability or above would search the very same tree, so it
+        gets the stored score; lower, it misses, as the search there
+        would stop at PROBABILITY_CUTOFF somewhere below;
+    """
+
+    MAX_ENTRIES = 200000
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max(1, int(max_entries))
+        self.__entries = collections.OrderedDict()
+        self.reset_counters()
+    # end def
+
+    def __len__(self):
+        return len(self.__entries)
+    # end def
+
+    def clear(self):
+        self.__entries.clear()
+        self.reset_counters()
+    # end def
+
+    def get(self, board, depth, probability):
+        _key = (board, depth)
+        _entry = self.__entries.get(_key)
+        if _entry is None or probability < _entry[1]:
+            self.misses += 1
+            return None
+        # end if
+        self.hits += 1
+        self.__entries.move_to_end(_key)
+        return _entry[0]
+    # end def
+
+    @property
+    def hit_rate(self):
+        _lookups = self.hits + self.misses
+        return (self.hits / _lookups) if _lookups else 0.0
+    # end def
+
+    def put(self, board, depth, probability, score):
+        _entries = self.__entries
+        _entries[(board, depth)] = (score, probability)
+        _entries.move_to_end((board, depth))
+        if len(_entries) > self.max_entries:
+            _entries.popitem(last=False)
+            self.evictions += 1
+        # end if
+    # end def
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    # end def
+
+# end class
+
+
+class Game2048Expectimax:
+    """
+        depth-limited expectimax player over bitboards: player nodes
+        take the best move, chance nodes average over every possible
+        tile spawn;
+
+        iterative deepening runs depth 1, 2, ... up to @depth and
+        keeps the deepest search that ended within @time_budget
+        seconds (depth 1 always completes);
+
+        with @afterstates, @evaluator values boards right after a
+        move, before the spawn, as game2048_ntuple networks learn
+        them: the last chance node of a path is evaluated as is, and
+        move gains on the way add up; depth 1 then plays the greedy
+        gain + V(afterstate) move;
+    """
+
+    DEPTH = 3
+    TIME_BUDGET = 0.1       # seconds per move, None for no limit
+    PROBABILITY_CUTOFF = 0.0001
+    CACHE_ENTRIES = TranspositionTable.MAX_ENTRIES  # 0 for no cache
+
+    def __init__(self, depth=DEPTH, time_budget=TIME_BUDGET,
+                 cache_entries=CACHE_ENTRIES, evaluator=None,
+                 afterstates=False):
+        self.depth = max(1, int(depth))
+        self.time_budget = time_budget
+        # leaf value of a bitboard, e.g. game2048_ntuple network's
+        self.evaluate = evaluator or evaluate
+        self.afterstates = afterstates
+        self.nodes = 0
+        self.cutoffs = 0    # subtrees cut at PROBABILITY_CUTOFF
+        self.cache = (
+            TranspositionTable(cache_entries) if cache_entries else None
+        )
+        self.__deadline = None
+        self.__abort = None
+    # end def
+
+    def _chance_node(self, board, depth, probability):
+        if self.afterstates and depth <= 1:
+            return self.evaluate(board)
+        # end if
+        _shifts = empty_shifts(board)
+        if not _shifts:
+            return self._max_node(board, depth - 1, probability)
+        # end if
+        _count = len(_shifts)
+        _total = 0.0
+        for _shift in _shifts:
+            for _rank, _odds in SPAWN_ODDS:
+                _total += _odds * self._max_node(
+                    board | (_rank << _shift), depth - 1,
+                    probability * _odds / _count
+                )
+            # end for
+        # end for
+        return _total / _count
+    # end def
+
+    def _max_node(self, board, depth, probability):
+        self.nodes += 1
+        if self.__deadline and time.perf_counter() > self.__deadline:
+            raise SearchTimeout
+        # end if
+        if self.__abort is not None and self.__abort():
+            raise SearchTimeout
+        # end if
+        if depth <= 0:
+            return self.evaluate(board)
+        elif probability < self.PROBABILITY_CUTOFF:
+            self.cutoffs += 1
+            if not self.afterstates:
+                return self.evaluate(board)
+            # end if
+            # afterstate values need a move first: one greedy ply
+            depth = 1
+        # end if
+        _cache = self.cache
+        if _cache is not None:
+            _best = _cache.get(board, depth, probability)
+            if _best is not None:
+                return _best
+            # end if
+        # end if
+        _cutoffs = self.cutoffs
+        _best = None
+        for _direction in DIRECTIONS:
+            _next, _gain = BB.move(board, _direction)
+            if _next != board:
+                _score = self._chance_node(_next, depth, probability)
+                if self.afterstates:
+                    _score += _gain
+                # end if
+                if _best is None or _score > _best:
+                    _best = _score
+                # end if
+            # end if
+        # end for
+        if _best is None and self.afterstates:
+            _best = 0.0     # game over: no score to come
+        elif _best is None:
+            # game over: lose the baseline every living board gets
+            _best = self.evaluate(board) - LOST_PENALTY
+        # end if
+        if _cache is not None and self.cutoffs == _cutoffs:
+            # whole subtree: valid at this probability and above
+            _cache.put(board, depth, probability, _best)
+        # end if
+        return _best
+    # end def
+
+    def get_move(self, board, abort=None):
+        """
+            returns the best direction for @board (bitboard int), or
+            None if no move is left;
+
+            @abort is an optional callable polled during the search,
+            returning True stops it at once (result is then the best
+            move of the deepest finished depth, if any);
+        """
+        _best = None
+        _started = time.perf_counter()
+        self.__abort = abort
+        for _depth in range(1, self.depth + 1):
+            if _depth > 1 and self.time_budget is not None:
+                self.__deadline = _started + self.time_budget
+            # end if
+            try:
+                _best = self.search_root(board, _depth)
+            except SearchTimeout:
+                break
+            finally:
+                self.__deadline = None
+            # end try
+        # end for
+        self.__abort = None
+        return _best
+    # end def
+
+    def search_node(self, board, depth, probability=1.0, deadline=None,
+                    abort=None):
+        """
+            returns the value of player node @board searched @depth
+            plies deep, or None if time.monotonic() went past
+            @deadline or @abort() returned True meanwhile;
+
+            this is the unit of work of split searches, see
+            game2048_parallel;
+        """
+        if deadline is not None:
+            self.__deadline = (
+                time.perf_counter() + deadline - time.monotonic()
+            )
+        # end if
+        self.__abort = abort
+        try:
+            return self._max_node(board, depth, probability)
+        except SearchTimeout:
+            return None
+        finally:
+            self.__deadline = None
+            self.__abort = None
+        # end try
+    # end def
+
+    def search_root(self, board, depth):
+        _best, _best_score = None, None
+        for _direction in DIRECTIONS:
+            _next, _gain = BB.move(board, _direction)
+            if _next != board:
+                _score = self._chance_node(_next, depth, 1.0)
+                if self.afterstates:
+                    _score += _gain
+                # end if
+                if _best is None or _score > _best_score:
+                    _best, _best_score = _direction, _score
+                # end if
+            # end if
+        # end for
+        return _best
+    # end def
+
+# end class
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import time
+
+from . import game2048_board as GB
+from . import game2048_log as GL
+from . import game2048_worker as GW
+
+
+class Game2048Autoplay:
+    """
+        plays @player moves on @grid's headless board as fast as
+        possible, or at @moves_per_second, and redraws the grid from
+        the latest board at most once every FRAME_INTERVAL ms;
+
+        searches run in a Game2048Worker thread; the Tk side only
+        waits for results up to TIME_SLICE per callback, then polls
+        again with after(), so the window keeps handling events;
+
+        start tiles pop in start(), before the first search: nothing
+        else spawns while a game is played, so a seeded game is the
+        same at any speed;
+    """
+
+    FRAME_INTERVAL = 16     # ms between two renderings
+    TIME_SLICE = 0.010      # seconds spent waiting moves per callback
+
+    def __init__(self, grid, player, moves_per_second=None):
+        self.grid = grid
+        self.player = player
+        self.worker = GW.Game2048Worker(player)
+        self.moves_per_second = moves_per_second
+        self.moves = 0
+        self.running = False
+        self.__started = 0.0
+        self.__dirty = False
+        self.__pending = None
+        self.__play_pid = None
+        self.__render_pid = None
+    # end def
+
+    def _moves_due(self):
+        if not self.moves_per_second:
+            return True
+        # end if
+        _elapsed = time.perf_counter() - self.__started
+        return self.moves < _elapsed * self.moves_per_second
+    # end def
+
+    def _next_delay(self):
+        # ms before next play() call
+        if not self.moves_per_second:
+            return 1
+        # end if
+        _due = self.__started + (self.moves + 1) / self.moves_per_second
+        return max(1, int(1000 * (_due - time.perf_counter())))
+    # end def
+
+    def play(self, tk_event=None, *args, **kw):
+        self.__play_pid = None
+        _board = self.grid.board
+        _deadline = time.perf_counter() + self.TIME_SLICE
+        while self.running and self._moves_due():
+            if self.__pending is None:
+                if _board.no_more_hints():
+                    self.running = False
+                    break
+                # end if
+                self.__pending = self.worker.submit(_board.bitboard)
+            # end if
+            _result = self.worker.get_result(
+                timeout=_deadline - time.perf_counter()
+            )
+            if _result is None:
+                break   # still searching, poll again later
+            # end if
+            _token, _searched, _direction = _result
+            if _token != self.__pending:
+                continue
+            # end if
+            self.__pending = None
+            if isinstance(_direction, Exception):
+                GL.logger.error(
+                    "AI search failed, autoplay stopped", exc_info=_direction
+                )
+                self.running = False
+                break
+            elif _searched != _board.bitboard:
+                continue    # board changed meanwhile (keyboard)
+            elif not _direction:
+                break   # no move found (aborted search)
+            # end if
+            if not _board.move(_direction):
+                # saturated board (tile above 32768): the search saw
+                # capped ranks, play the first move that really acts
+                _direction = next(
+                    (_other for _other in GB.DIRECTIONS
+                     if _board.move(_other)), None
+                )
+                if not _direction:
+                    continue    # game over, seen on next round
+                # end if
+            # end if
+            _board.pop_tile()
+            self.moves += 1
+            self.__dirty = True
+            if time.perf_counter() >= _deadline:
+                break
+            # end if
+        # end while
+        if self.running:
+            self.__play_pid = self.grid.after(self._next_delay(), self.play)
+        # end if
+    # end def
+
+    def close(self):
+        self.stop()
+        self.worker.close()
+    # end def
+
+    def render(self, tk_event=None, *args, **kw):
+        self.__render_pid = None
+        if self.__dirty:
+            self.__dirty = False
+            self.grid.render_board()
+        # end if
+        if self.running:
+            self.__render_pid = self.grid.after(
+                self.FRAME_INTERVAL, self.render
+            )
+        # end if
+    # end def
+
+    def start(self, start_tiles=0):
+        self.stop()
+        for _n in range(start_tiles):
+            self.grid.board.pop_tile()
+        # end for
+        self.running = True
+        self.moves = 0
+        self.__started = time.perf_counter()
+        self.__dirty = start_tiles > 0
+        self.__pending = None
+        self.__play_pid = self.grid.after(1, self.play)
+        self.__render_pid = self.grid.after(self.FRAME_INTERVAL, self.render)
+    # end def
+
+    def stop(self):
+        self.running = False
+        self.worker.cancel()
+        self.__pending = None
+        for _pid in (self.__play_pid, self.__render_pid):
+            if _pid:
+                self.grid.after_cancel(_pid)
+            # end if
+        # end for
+        self.__play_pid = self.__render_pid = None
+    # end def
+
+# end class
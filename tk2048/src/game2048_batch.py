@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+# end try
+
+from . import game2048_bitboard as BB
+from .game2048_board import DIRECTIONS
+
+
+if np is not None:
+    # no copy, stored dtypes: shares the mapped table pages
+    ROW_LEFT = np.frombuffer(BB.ROW_LEFT, dtype=np.uint16)
+    ROW_SCORE = np.frombuffer(BB.ROW_SCORE, dtype=np.uint32)
+# end if
+
+
+def _orient(boards, direction):
+    # views turning @direction into a move to the left
+    if direction == "left":
+        return boards
+    elif direction == "right":
+        return boards[:, :, ::-1]
+    elif direction == "up":
+        return boards.transpose(0, 2, 1)
+    # end if
+    return boards.transpose(0, 2, 1)[:, :, ::-1]
+# end def
+
+
+def _unorient(boards, direction):
+    if direction == "left":
+        return boards
+    elif direction == "right":
+        return boards[:, :, ::-1]
+    elif direction == "up":
+        return boards.transpose(0, 2, 1)
+    # end if
+    return boards[:, :, ::-1].transpose(0, 2, 1)
+# end def
+
+
+def move_boards(boards, direction):
+    """
+        moves every (4, 4) log2 board of @boards towards @direction
+        with the bitboard row tables, so that results match
+        Game2048Board.move() exactly;
+
+        returns (new_boards, gained_scores);
+    """
+    _lines = _orient(boards, direction).astype(np.uint32)
+    _index = (
+        _lines[..., 0] | (_lines[..., 1] << 4) |
+        (_lines[..., 2] << 8) | (_lines[..., 3] << 12)
+    )
+    _moved = ROW_LEFT[_index]
+    _new = np.empty(_lines.shape, dtype=np.uint8)
+    for _i in range(4):
+        _new[..., _i] = (_moved >> (4 * _i)) & BB.CELL_MASK
+    # end for
+    return (
+        np.ascontiguousarray(_unorient(_new, direction)),
+        ROW_SCORE[_index].sum(axis=1, dtype=np.int64),
+    )
+# end def
+
+
+def decode_bitboards(bitboards):
+    # (B, 4, 4) log2 boards out of game2048_bitboard ints
+    _shifts = np.arange(0, 64, 4, dtype=np.uint64)
+    _boards = np.array(bitboards, dtype=np.uint64)[:, None] >> _shifts
+    return (_boards & BB.CELL_MASK).astype(np.uint8).reshape(-1, 4, 4)
+# end def
+
+
+def has_moves(boards):
+    return (
+        (boards == 0).any(axis=(1, 2)) |
+        (boards[:, :, 1:] == boards[:, :, :-1]).any(axis=(1, 2)) |
+        (boards[:, 1:, :] == boards[:, :-1, :]).any(axis=(1, 2))
+    )
+# end def
+
+
+class Game2048Batch:
+    """
+        steps @size 2048 games at once: boards are a (B, 4, 4) uint8
+        array of log2 tile values (0 means empty cell);
+
+        moves are indices in DIRECTIONS, one per board;
+    """
+
+    SPAWN_FOUR = 0.25       # same odds as choice([2, 4, 2, 2])
+
+    def __init__(self, size, seed=None):
+        if np is None:
+            raise ImportError(
+                "Game2048Batch needs numpy, please install it."
+            )
+        # end if
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros((size, 4, 4), dtype=np.uint8)
+        self.scores = np.zeros(size, dtype=np.int64)
+        self.done = np.zeros(size, dtype=bool)
+        self.reset()
+    # end def
+
+    def reset(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.size, dtype=bool)
+        # end if
+        self.boards[mask] = 0
+        self.scores[mask] = 0
+        self.done[mask] = False
+        for _n in range(2):
+            self.spawn(mask)
+        # end for
+    # end def
+
+    def set_bitboards(self, bitboards):
+        # starts every game over from game2048_bitboard ints
+        self.boards[:] = decode_bitboards(bitboards)
+        self.scores[:] = 0
+        self.done[:] = ~has_moves(self.boards)
+    # end def
+
+    def spawn(self, mask):
+        _index = np.flatnonzero(mask)
+        if not _index.size:
+            return
+        # end if
+        _flat = self.boards[_index].reshape(len(_index), 16)
+        _keys = self.rng.random(_flat.shape)
+        _keys[_flat != 0] = -1.0
+        _cells = _keys.argmax(axis=1)
+        _ranks = np.where(
+            self.rng.random(len(_index)) < self.SPAWN_FOUR, 2, 1
+        ).astype(np.uint8)
+        # full boards never get here after a move that changed them
+        _ranks[_keys[np.arange(len(_index)), _cells] < 0] = 0
+        _flat[np.arange(len(_index)), _cells] |= _ranks
+        self.boards[_index] = _flat.reshape(len(_index), 4, 4)
+    # end def
+
+    def step(self, moves):
+        """
+            plays @moves (array of DIRECTIONS indices) on every board
+            still alive, spawns a tile where the board changed;
+
+            returns (rewards, done, changed) arrays of shape (B,);
+        """
+        moves = np.asarray(moves)
+        _rewards = np.zeros(self.size, dtype=np.int64)
+        _changed = np.zeros(self.size, dtype=bool)
+        _alive = ~self.done
+        for _code, _direction in enumerate(DIRECTIONS):
+            _index = np.flatnonzero(_alive & (moves == _code))
+            if not _index.size:
+                continue
+            # end if
+            _old = self.boards[_index]
+            _new, _gained = move_boards(_old, _direction)
+            _changed[_index] = (_new != _old).any(axis=(1, 2))
+            self.boards[_index] = _new
+            _rewards[_index] = _gained
+        # end for
+        self.scores += _rewards
+        self.spawn(_changed)
+        self.done |= ~has_moves(self.boards)
+        return (_rewards, self.done.copy(), _changed)
+    # end def
+
+    def values(self):
+        return np.where(
+            self.boards > 0, np.left_shift(1, self.boards, dtype=np.int64), 0
+        )
+    # end def
+
+# end class
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+# compact 4x4 board encoding: one int of 16 nibbles, each nibble
+# holding the log2 of a tile value (0 means empty cell);
+# nibble index is (4 * row + column), so row 0 lives in the low 16
+# bits and column 0 in the low nibble of each row;
+# left/right moves are four lookups in 65,536-entry row tables,
+# up/down are the same lookups between two transpositions;
+# tables are built once, then memory-mapped from the table cache
+
+import array
+
+from . import game2048_tables as GT
+
+ROWS = COLUMNS = 4
+ROW_MASK = 0xFFFF
+CELL_MASK = 0xF
+MAX_RANK = 15       # 2 ** 15 = 32768, nibble limit
+
+# legal_moves() mask bits
+DIRECTION_BITS = dict(down=1, left=2, right=4, up=8)
+
+
+def _reverse_row(row):
+    return (
+        ((row & 0x000F) << 12) | ((row & 0x00F0) << 4) |
+        ((row & 0x0F00) >> 4) | ((row & 0xF000) >> 12)
+    )
+# end def
+
+
+def _build_tables():
+    _left = [0] * 65536
+    _right = [0] * 65536
+    _score = [0] * 65536
+    for _row in range(65536):
+        _ranks = [(_row >> (4 * _i)) & CELL_MASK for _i in range(4)]
+        # same rules as Game2048Board.move(): pack, then fuse each pair
+        # of equal neighbours once, from the edge tiles are pushed to
+        _packed = [_r for _r in _ranks if _r]
+        _line = list()
+        _gain = 0
+        _i = 0
+        while _i < len(_packed):
+            if _i + 1 < len(_packed) and _packed[_i] == _packed[_i + 1]:
+                _rank = min(_packed[_i] + 1, MAX_RANK)
+                _gain += 1 << _rank
+                _line.append(_rank)
+                _i += 2
+            else:
+                _line.append(_packed[_i])
+                _i += 1
+            # end if
+        # end while
+        _line += [0] * (4 - len(_line))
+        _result = 0
+        for _i, _rank in enumerate(_line):
+            _result |= _rank << (4 * _i)
+        # end for
+        _left[_row] = _result
+        # equal runs fuse the same way whatever the direction is, so
+        # one score table serves both left and right moves
+        _score[_row] = _gain
+    # end for
+    for _row in range(65536):
+        _right[_row] = _reverse_row(_left[_reverse_row(_row)])
+    # end for
+    return (_left, _right, _score)
+# end def
+
+
+def _build_arrays():
+    _left, _right, _score = _build_tables()
+    return dict(
+        row_left=array.array("H", _left),
+        row_right=array.array("H", _right),
+        row_score=array.array("I", _score),
+        # per row: 1 if it can move left, 2 if it can move right
+        row_moves=array.array("B", [
+            (_left[_row] != _row) | ((_right[_row] != _row) << 1)
+            for _row in range(65536)
+        ]),
+        row_reverse=array.array("H", map(_reverse_row, range(65536))),
+    )
+# end def
+
+
+def load_tables(force=False):
+    return GT.load(
+        "bitboard", _build_arrays, force=force,
+        depends=(_build_tables, _reverse_row),
+    )
+# end def
+
+
+_TABLES = load_tables()
+ROW_LEFT = _TABLES["row_left"]
+ROW_RIGHT = _TABLES["row_right"]
+ROW_SCORE = _TABLES["row_score"]
+ROW_MOVES = _TABLES["row_moves"]
+ROW_REVERSE = _TABLES["row_reverse"]
+
+# (row flags | column flags << 2) -> legal_moves() mask
+_MOVE_MASKS = [
+    (DIRECTION_BITS["left"] if _flags & 1 else 0) |
+    (DIRECTION_BITS["right"] if _flags & 2 else 0) |
+    (DIRECTION_BITS["up"] if _flags & 4 else 0) |
+    (DIRECTION_BITS["down"] if _flags & 8 else 0)
+    for _flags in range(16)
+]
+
+
+def can_move(board):
+    if (
+            ROW_MOVES[board & ROW_MASK] or
+            ROW_MOVES[(board >> 16) & ROW_MASK] or
+            ROW_MOVES[(board >> 32) & ROW_MASK] or
+            ROW_MOVES[(board >> 48) & ROW_MASK]):
+        return True
+    # end if
+    _transposed = transpose(board)
+    return bool(
+        ROW_MOVES[_transposed & ROW_MASK] or
+        ROW_MOVES[(_transposed >> 16) & ROW_MASK] or
+        ROW_MOVES[(_transposed >> 32) & ROW_MASK] or
+        ROW_MOVES[(_transposed >> 48) & ROW_MASK]
+    )
+# end def
+
+
+def decode(board):
+    return [
+        [
+            (1 << _rank) if _rank else 0
+            for _rank in (
+                (board >> (4 * (4 * _row + _column))) & CELL_MASK
+                for _column in range(COLUMNS)
+            )
+        ]
+        for _row in range(ROWS)
+    ]
+# end def
+
+
+def encode(cells):
+    _board = 0
+    for _row, _line in enumerate(cells):
+        for _column, _value in enumerate(_line):
+            if _value:
+                _board |= (
+                    min(_value.bit_length() - 1, MAX_RANK)
+                    << (4 * (4 * _row + _column))
+                )
+            # end if
+        # end for
+    # end for
+    return _board
+# end def
+
+
+def get_rank(board, row, column):
+    return (board >> (4 * (4 * row + column))) & CELL_MASK
+# end def
+
+
+def get_value(board, row, column):
+    _rank = get_rank(board, row, column)
+    return (1 << _rank) if _rank else 0
+# end def
+
+
+def legal_moves(board):
+    # DIRECTION_BITS mask of the moves that would change @board
+    _transposed = transpose(board)
+    return _MOVE_MASKS[
+        ROW_MOVES[board & ROW_MASK] |
+        ROW_MOVES[(board >> 16) & ROW_MASK] |
+        ROW_MOVES[(board >> 32) & ROW_MASK] |
+        ROW_MOVES[(board >> 48) & ROW_MASK] |
+        (ROW_MOVES[_transposed & ROW_MASK] << 2) |
+        (ROW_MOVES[(_transposed >> 16) & ROW_MASK] << 2) |
+        (ROW_MOVES[(_transposed >> 32) & ROW_MASK] << 2) |
+        (ROW_MOVES[(_transposed >> 48) & ROW_MASK] << 2)
+    ]
+# end def
+
+
+def max_rank(board):
+    _max = 0
+    while board:
+        _max = max(_max, board & CELL_MASK)
+        board >>= 4
+    # end while
+    return _max
+# end def
+
+
+def _move_rows(board, table):
+    return (
+        table[board & ROW_MASK] |
+        (table[(board >> 16) & ROW_MASK] << 16) |
+        (table[(board >> 32) & ROW_MASK] << 32) |
+        (table[(board >> 48) & ROW_MASK] << 48)
+    )
+# end def
+
+
+def _score_rows(board):
+    return (
+        ROW_SCORE[board & ROW_MASK] +
+        ROW_SCORE[(board >> 16) & ROW_MASK] +
+        ROW_SCORE[(board >> 32) & ROW_MASK] +
+        ROW_SCORE[(board >> 48) & ROW_MASK]
+    )
+# end def
+
+
+def move_down(board):
+    _transposed = transpose(board)
+    return (
+        transpose(_move_rows(_transposed, ROW_RIGHT)),
+        _score_rows(_transposed)
+    )
+# end def
+
+
+def move_left(board):
+    return (_move_rows(board, ROW_LEFT), _score_rows(board))
+# end def
+
+
+def move_right(board):
+    return (_move_rows(board, ROW_RIGHT), _score_rows(board))
+# end def
+
+
+def move_up(board):
+    _transposed = transpose(board)
+    return (
+        transpose(_move_rows(_transposed, ROW_LEFT)),
+        _score_rows(_transposed)
+    )
+# end def
+
+
+MOVES = dict(
+    down=move_down, left=move_left, right=move_right, up=move_up,
+)
+
+
+def move(board, direction):
+    return MOVES[direction](board)
+# end def
+
+
+def peek_move(board, direction):
+    """
+        tries @direction on @board without playing it: no spawn, no
+        rng draw, no view update;
+
+        returns (new_board, gained_score, changed);
+    """
+    _new, _score = MOVES[direction](board)
+    return (_new, _score, _new != board)
+# end def
+
+
+def set_rank(board, row, column, rank):
+    _shift = 4 * (4 * row + column)
+    return (board & ~(CELL_MASK << _shift)) | (rank << _shift)
+# end def
+
+
+def transpose(board):
+    _a1 = board & 0xF0F00F0FF0F00F0F
+    _a2 = board & 0x0000F0F00000F0F0
+    _a3 = board & 0x0F0F00000F0F0000
+    _a = _a1 | (_a2 << 12) | (_a3 >> 12)
+    _b1 = _a & 0xFF00FF0000FF00FF
+    _b2 = _a & 0x00FF00FF00000000
+    _b3 = _a & 0x00000000FF00FF00
+    return _b1 | (_b2 >> 24) | (_b3 << 24)
+# end def
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+from . import game2048_bitboard as BB
+from . import game2048_random as GR
+
+
+# board directions, same names as Game2048Grid.move_tiles_*()
+DIRECTIONS = ("down", "left", "right", "up")
+
+# set bits count and positions for each byte value, used to pick the
+# n-th empty cell of a bitmask without scanning cells
+_BYTE_BITS = [
+    [_bit for _bit in range(8) if _byte & (1 << _bit)]
+    for _byte in range(256)
+]
+
+
+# biggest tile value the bitboard encodes exactly
+BITBOARD_LIMIT = 1 << BB.MAX_RANK
+
+
+def _rank_of(value):
+    return min(value.bit_length() - 1, BB.MAX_RANK)
+# end def
+
+
+def select_bit(mask, index):
+    # position of the @index-th set bit of @mask, lowest bit first
+    _offset = 0
+    while True:
+        _bits = _BYTE_BITS[mask & 0xFF]
+        if index < len(_bits):
+            return _offset + _bits[index]
+        # end if
+        index -= len(_bits)
+        mask >>= 8
+        _offset += 8
+    # end while
+# end def
+
+
+class BoardError (Exception):
+    pass
+# end class
+
+
+class Game2048Board:
+    """
+        headless 2048 engine: no tkinter in here, so it can run on
+        display-less boxes as fast as Python allows;
+
+        Game2048Grid is only a view over this board;
+
+        cells hold true values, without limit; the bitboard caps
+        ranks at game2048_bitboard.MAX_RANK (32768): once a tile
+        goes above, the board is "saturated" and legal_moves() and
+        no_more_hints() scan cells instead of trusting it;
+    """
+
+    ROWS = COLUMNS = 4
+
+    def __init__(self, rows=ROWS, columns=COLUMNS, rng=None):
+        self.rows = rows
+        self.columns = columns
+        # spawns only draw from this per-game stream
+        self.rng = rng if rng is not None else GR.Game2048Random()
+        # optional game2048_replay.Game2048Recorder, told of every
+        # move and spawn
+        self.recorder = None
+        # lines of (row, column) cells, ordered from the edge tiles
+        # are pushed to, for each direction
+        self.__lines = dict(
+            down=[
+                [(_row, _column) for _row in range(rows - 1, -1, -1)]
+                for _column in range(columns)
+            ],
+            left=[
+                [(_row, _column) for _column in range(columns)]
+                for _row in range(rows)
+            ],
+            right=[
+                [(_row, _column) for _column in range(columns - 1, -1, -1)]
+                for _row in range(rows)
+            ],
+            up=[
+                [(_row, _column) for _row in range(rows)]
+                for _column in range(columns)
+            ],
+        )
+        self.reset_board()
+    # end def
+
+    @property
+    def bitboard(self):
+        # log2 nibble per cell, kept up to date by every change; this
+        # is the game2048_bitboard encoding for 4x4 boards (exact
+        # unless saturated)
+        return self.__bitboard
+    # end def
+
+    @property
+    def cells(self):
+        return self.__cells
+    # end def
+
+    def copy(self):
+        _board = Game2048Board(self.rows, self.columns, self.rng.copy())
+        _board.set_cells(self.cells)
+        _board.score = self.score
+        return _board
+    # end def
+
+    @property
+    def empty_count(self):
+        return self.__empty_count
+    # end def
+
+    @property
+    def empty_mask(self):
+        # bit (row * columns + column) is set for each empty cell
+        return self.__empty_mask
+    # end def
+
+    def get_available_box(self):
+        if not self.__empty_mask:
+            raise BoardError("no more room in board")
+        # end if
+        _index = select_bit(
+            self.__empty_mask, self.rng.randrange(self.__empty_count)
+        )
+        return divmod(_index, self.columns)
+    # end def
+
+    def get_empty_cells(self):
+        return [
+            divmod(_index, self.columns)
+            for _index in range(self.rows * self.columns)
+            if self.__empty_mask & (1 << _index)
+        ]
+    # end def
+
+    def get_value(self, row, column):
+        return self.__cells[row][column]
+    # end def
+
+    def is_full(self):
+        return not self.__empty_mask
+    # end def
+
+    @property
+    def max_value(self):
+        return max(max(_line) for _line in self.__cells)
+    # end def
+
+    def move(self, direction, trace=None):
+        """
+            moves tiles towards @direction and returns True if
+            anything changed;
+
+            if @trace is a list, it gets ("fuse", into, void, value)
+            and ("move", from, to) events in the very order they
+            happen, so that a view can replay them;
+        """
+        try:
+            _lines = self.__lines[direction]
+        except KeyError:
+            raise BoardError(
+                "unknown direction '{}'".format(direction)
+            )
+        # end try
+        _cells = self.__cells
+        _columns = self.columns
+        _empty_mask = self.__empty_mask
+        _bitboard = self.__bitboard
+        _fused = 0
+        _acted = False
+        for _line in _lines:
+            # fusions
+            for _i, (_row, _column) in enumerate(_line):
+                _value = _cells[_row][_column]
+                if _value:
+                    for _row2, _column2 in _line[_i + 1:]:
+                        _value2 = _cells[_row2][_column2]
+                        if _value2 == _value:
+                            _value += _value2
+                            _cells[_row][_column] = _value
+                            _cells[_row2][_column2] = 0
+                            _index = _row * _columns + _column
+                            _index2 = _row2 * _columns + _column2
+                            _empty_mask |= 1 << _index2
+                            if (_bitboard >> (4 * _index)) & 0xF < BB.MAX_RANK:
+                                _bitboard += 1 << (4 * _index)
+                            # end if
+                            _bitboard &= ~(0xF << (4 * _index2))
+                            _fused += 1
+                            if _value > BITBOARD_LIMIT:
+                                self.__saturated = True
+                            # end if
+                            self.score += _value
+                            if trace is not None:
+                                trace.append((
+                                    "fuse", (_row, _column),
+                                    (_row2, _column2), _value
+                                ))
+                            # end if
+                            _acted = True
+                        # end if
+                        if _value2:
+                            break
+                        # end if
+                    # end for - next tile
+                # end if - tile
+            # end for - fusions
+            # scrollings
+            _empty = None
+            for _i, (_row, _column) in enumerate(_line):
+                _value = _cells[_row][_column]
+                if not _value and _empty is None:
+                    _empty = _i
+                elif _value and _empty is not None:
+                    _row2, _column2 = _line[_empty]
+                    _cells[_row2][_column2] = _value
+                    _cells[_row][_column] = 0
+                    _index = _row * _columns + _column
+                    _index2 = _row2 * _columns + _column2
+                    _empty_mask ^= (1 << _index) | (1 << _index2)
+                    _rank = (_bitboard >> (4 * _index)) & 0xF
+                    _bitboard &= ~(0xF << (4 * _index))
+                    _bitboard |= _rank << (4 * _index2)
+                    if trace is not None:
+                        trace.append((
+                            "move", (_row, _column), (_row2, _column2)
+                        ))
+                    # end if
+                    _empty += 1
+                    _acted = True
+                # end if
+            # end for - scrollings
+        # end for - lines
+        self.__empty_mask = _empty_mask
+        self.__empty_count += _fused
+        self.__bitboard = _bitboard
+        if _acted and self.recorder is not None:
+            self.recorder.record_move(direction)
+        # end if
+        return _acted
+    # end def
+
+    def move_down(self, trace=None):
+        return self.move("down", trace)
+    # end def
+
+    def move_left(self, trace=None):
+        return self.move("left", trace)
+    # end def
+
+    def move_right(self, trace=None):
+        return self.move("right", trace)
+    # end def
+
+    def move_up(self, trace=None):
+        return self.move("up", trace)
+    # end def
+
+    def legal_moves(self):
+        # game2048_bitboard.DIRECTION_BITS mask
+        if self.rows == self.columns == 4 and not self.__saturated:
+            return BB.legal_moves(self.__bitboard)
+        # end if
+        # probe moves on copies: the rare slow way
+        _mask = 0
+        for _direction in DIRECTIONS:
+            if self.copy().move(_direction):
+                _mask |= BB.DIRECTION_BITS[_direction]
+            # end if
+        # end for
+        return _mask
+    # end def
+
+    def no_more_hints(self):
+        if self.__empty_mask:
+            return False
+        elif self.rows == self.columns == 4 and not self.__saturated:
+            return not BB.can_move(self.__bitboard)
+        # end if
+        # full board: lost unless two neighbours match
+        _cells = self.__cells
+        for _row in range(self.rows):
+            for _column in range(self.columns):
+                _value = _cells[_row][_column]
+                if (
+                    (_column + 1 < self.columns and
+                        _value == _cells[_row][_column + 1]) or
+                    (_row + 1 < self.rows and
+                        _value == _cells[_row + 1][_column])):
+                    return False
+                # end if
+            # end for - columns
+        # end for - rows
+        return True
+    # end def
+
+    def pop_tile(self):
+        if not self.is_full():
+            _value = self.rng.choice([2, 4, 2, 2])
+            _row, _column = self.get_available_box()
+            self.set_value(_row, _column, _value)
+            if self.recorder is not None:
+                self.recorder.record_spawn(_row, _column, _value)
+            # end if
+            return (_row, _column, _value)
+        # end if - room in board
+        return None
+    # end def
+
+    @property
+    def saturated(self):
+        # True once a tile is above BITBOARD_LIMIT: ranks are capped
+        # in the bitboard, which no longer tells the whole board
+        return self.__saturated
+    # end def
+
+    def reset_board(self):
+        self.set_cells([[0] * self.columns for _row in range(self.rows)])
+        self.score = 0
+    # end def
+
+    def set_bitboard(self, board):
+        self.set_cells(BB.decode(board))
+    # end def
+
+    def set_cells(self, cells):
+        self.__cells = [list(_line) for _line in cells]
+        self.__empty_mask = 0
+        self.__empty_count = 0
+        self.__bitboard = 0
+        self.__saturated = False
+        for _row, _line in enumerate(self.__cells):
+            for _column, _value in enumerate(_line):
+                _index = _row * self.columns + _column
+                if not _value:
+                    self.__empty_mask |= 1 << _index
+                    self.__empty_count += 1
+                else:
+                    self.__bitboard |= _rank_of(_value) << (4 * _index)
+                    self.__saturated |= _value > BITBOARD_LIMIT
+                # end if
+            # end for
+        # end for
+    # end def
+
+    def set_value(self, row, column, value):
+        _index = row * self.columns + column
+        if self.__cells[row][column]:
+            self.__empty_mask |= 1 << _index
+            self.__empty_count += 1
+            self.__bitboard &= ~(0xF << (4 * _index))
+        # end if
+        if value:
+            self.__empty_mask &= ~(1 << _index)
+            self.__empty_count -= 1
+            self.__bitboard |= _rank_of(value) << (4 * _index)
+            self.__saturated |= value > BITBOARD_LIMIT
+        # end if
+        self.__cells[row][column] = value
+    # end def
+
+# end class
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+# table driven board evaluation: every row and column of a bitboard
+# scores one lookup in a 65,536-entry table of per-row heuristics,
+# so a board takes 8 lookups (4 rows, 4 columns); tables depend on
+# the weights only, they live in the table cache keyed by them: the
+# default weights' tables, and those of the last other weights used
+
+import array
+import zlib
+
+from . import game2048_bitboard as BB
+from . import game2048_tables as GT
+
+
+# any living board scores above a lost one by this much
+LOST_PENALTY = 200000.0
+
+# corner is off on purpose: the bonus (corner * rank of the line's
+# biggest tile, when that tile sits at an end of an edge row or
+# column) lowered depth-2 scores at every weight tried, 10 to 300,
+# monotonicity already pulls big tiles to the edges; set it in
+# Game2048Evaluator(corner=...) or AI_WEIGHTS to experiment
+WEIGHTS = dict(
+    baseline=LOST_PENALTY / 8.0,    # per row/column, see LOST_PENALTY
+    corner=0.0,             # edge rows: biggest tile at an end, off
+    empty=270.0,
+    merges=700.0,
+    monotonicity=47.0,
+    monotonicity_power=4.0,
+    sum=11.0,
+    sum_power=3.5,
+)
+
+
+def row_score(row, weights, edge=False):
+    # heuristic value of one 16-bit @row (or column)
+    _ranks = [(row >> (4 * _i)) & BB.CELL_MASK for _i in range(4)]
+    _sum = 0.0
+    _empty = 0
+    _merges = 0
+    _previous = 0
+    _counter = 0
+    for _rank in _ranks:
+        _sum += _rank ** weights["sum_power"]
+        if not _rank:
+            _empty += 1
+        else:
+            if _previous == _rank:
+                _counter += 1
+            elif _counter:
+                _merges += 1 + _counter
+                _counter = 0
+            # end if
+            _previous = _rank
+        # end if
+    # end for
+    if _counter:
+        _merges += 1 + _counter
+    # end if
+    _mono_left = _mono_right = 0.0
+    _power = weights["monotonicity_power"]
+    for _i in range(3):
+        _a = _ranks[_i] ** _power
+        _b = _ranks[_i + 1] ** _power
+        if _ranks[_i] > _ranks[_i + 1]:
+            _mono_left += _a - _b
+        else:
+            _mono_right += _b - _a
+        # end if
+    # end for
+    _score = (
+        weights["baseline"] +
+        weights["empty"] * _empty +
+        weights["merges"] * _merges -
+        weights["monotonicity"] * min(_mono_left, _mono_right) -
+        weights["sum"] * _sum
+    )
+    _max = max(_ranks)
+    if edge and weights["corner"] and _max in (_ranks[0], _ranks[3]):
+        _score += weights["corner"] * _max
+    # end if
+    return _score
+# end def
+
+
+def row_distinct(row):
+    # tiles left in @row once neighbour pairs fused, in one move
+    _ranks = [
+        _rank for _rank in
+        ((row >> (4 * _i)) & BB.CELL_MASK for _i in range(4)) if _rank
+    ]
+    return len(_ranks) - sum(
+        _ranks[_i] == _ranks[_i + 1] for _i in range(len(_ranks) - 1)
+    )
+# end def
+
+
+def table_name(weights):
+    # cache file name of the score tables for @weights
+    _key = repr(sorted(weights.items()))
+    return "heuristic-{:08x}".format(zlib.crc32(_key.encode()))
+# end def
+
+
+def load_tables(weights, force=False):
+    """
+        "edge" (rows/columns 0 and 3) and "inner" score tables for
+        @weights, built only if the cache has none for them;
+
+        tables of other non-default weights are dropped from the
+        cache, 1 MB each would pile up while tuning weights;
+    """
+    def _build():
+        return dict(
+            edge=array.array(
+                "d", (row_score(_row, weights, True) for _row in range(65536))
+            ),
+            inner=array.array(
+                "d", (row_score(_row, weights) for _row in range(65536))
+            ),
+        )
+    # end def
+    _name = table_name(weights)
+    _tables = GT.load(
+        _name, _build, key=repr(sorted(weights.items())), force=force,
+        depends=(row_score,),
+    )
+    GT.prune("heuristic-", keep=(_name, table_name(WEIGHTS)))
+    return _tables
+# end def
+
+
+def load_distinct(force=False):
+    # row -> row_distinct(row) table
+    return GT.load(
+        "row-distinct",
+        lambda: dict(
+            distinct=array.array("B", map(row_distinct, range(65536)))
+        ),
+        force=force, depends=(row_distinct,),
+    )["distinct"]
+# end def
+
+
+ROW_DISTINCT = load_distinct()
+
+
+class Game2048Evaluator:
+    """
+        heuristic bitboard evaluation out of per-row tables: any
+        WEIGHTS key may be given in @weights, the others keep their
+        default (the corner bonus is off unless given, see WEIGHTS);
+
+        set_weights() swaps tables only when weights really change;
+        pickles carry the weights only, e.g. to pool workers;
+    """
+
+    def __init__(self, **weights):
+        self.weights = None
+        self.set_weights(**weights)
+    # end def
+
+    def __call__(self, board):
+        return self.evaluate(board)
+    # end def
+
+    def __getstate__(self):
+        # pickled as its weights: tables get mapped again on arrival
+        return self.weights
+    # end def
+
+    def __setstate__(self, weights):
+        self.weights = None
+        self.set_weights(**weights)
+    # end def
+
+    def evaluate(self, board):
+        _edge = self.__edge
+        _inner = self.__inner
+        _transposed = BB.transpose(board)
+        # same order of sums as rows/columns interleaved
+        return (
+            _edge[board & 0xFFFF] + _edge[_transposed & 0xFFFF] +
+            _inner[(board >> 16) & 0xFFFF] +
+            _inner[(_transposed >> 16) & 0xFFFF] +
+            _inner[(board >> 32) & 0xFFFF] +
+            _inner[(_transposed >> 32) & 0xFFFF] +
+            _edge[board >> 48] + _edge[_transposed >> 48]
+        )
+    # end def
+
+    def set_weights(self, **weights):
+        _unknown = set(weights) - set(WEIGHTS)
+        if _unknown:
+            raise ValueError(
+                "unknown heuristic weights: {}".format(
+                    ", ".join(sorted(_unknown))
+                )
+            )
+        # end if
+        _weights = dict(WEIGHTS, **weights)
+        if _weights != self.weights:
+            _tables = load_tables(_weights)
+            self.__edge = _tables["edge"]
+            self.__inner = _tables["inner"]
+            self.weights = _weights
+        # end if
+    # end def
+
+# end class
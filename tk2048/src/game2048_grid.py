@@ -24,8 +24,6 @@
     If not, see http://www.gnu.org/licenses/
 """
 
-import random
-
 try:
     import Tkinter as tk
     import ttk
@@ -35,6 +33,8 @@ except:
 # end try
 
 from . import game_grid as GG
+from . import game2048_bitboard as BB
+from . import game2048_board as GB
 
 
 class Game2048Grid (GG.GameGrid):
@@ -76,6 +76,31 @@ class Game2048Grid (GG.GameGrid):
         # end if
     # end def
 
+    @property
+    def board(self):
+        return self.__board
+    # end def
+
+    @property
+    def cells(self):
+        # canonical value matrix, kept up to date by the board on
+        # every move, fusion and pop: read only, never rebuilt
+        return self.__board.cells
+    # end def
+
+    @property
+    def fingerprint(self):
+        # equal fingerprints, equal boards: the board's bitboard is
+        # updated along with each cell, so this costs nothing
+        return self.__board.bitboard
+    # end def
+
+    def clear_all(self, tk_event=None, *args, **kw):
+        GG.GameGrid.clear_all(self, tk_event, *args, **kw)
+        self.board.reset_board()
+        self.__rendered = self.board.bitboard
+    # end def
+
     def fuse_tiles(self, into_tile, void_tile):
         _into, _void = into_tile, void_tile
         if _into and _void and (_into.value == _void.value):
@@ -98,61 +123,53 @@ class Game2048Grid (GG.GameGrid):
             0, 0, _grid_width, _grid_height,
             fill=self.FGCOLOR, width=0,
         )
-        _anim_rect = GG.GridAnimation(self)
-        _anim_rect.register(
-            self.animate_rectangle, item_id=_rect_id,
+        self.animator.add(
+            self.animate_rectangle, ("gray12", "gray25", "gray50"),
+            item_id=_rect_id,
         )
-        _anim_rect.start(sequence=("gray12", "gray25", "gray50"))
         _text_id = self.create_text(
             _grid_width // 2, _grid_height // 2 - 25,
             text="GAME OVER", font="sans 32 bold", fill="white",
             state=tk.HIDDEN,
         )
-        _anim_text1 = GG.GridAnimation(self)
-        _anim_text1.register(
-            self.animate_text_game_over, item_id=_text_id,
-        )
-        _anim_text1.start_after(
-            delay=800, interval=50,
-            sequence=("#c9bdb4", "#d0c5be", "#d7cdc8", "#ded5d2",
-                      "#e5dddc", "#ece5e6", "#f3edf0", "#ffffff"),
+        self.animator.add(
+            self.animate_text_game_over,
+            ("#c9bdb4", "#d0c5be", "#d7cdc8", "#ded5d2",
+             "#e5dddc", "#ece5e6", "#f3edf0", "#ffffff"),
+            delay=800, interval=50, item_id=_text_id,
         )
         _text_id = self.create_text(
             _grid_width // 2, _grid_height // 2 + 30,
             text="Try again", font="sans 16 bold", fill="white",
             state=tk.HIDDEN,
         )
-        _anim_text2 = GG.GridAnimation(self)
-
-        _anim_text2.register(
-            self.animate_text_try_again, item_id=_text_id,
-        )
-        _anim_text2.start_after(
-            delay=1600, interval=80,
-            sequence=("#c9bdb4", "#d0c5be", "#d7cdc8", "#ded5d2",
-                      "#e5dddc", "#ece5e6", "#f3edf0", "#ffffff"),
+        self.animator.add(
+            self.animate_text_try_again,
+            ("#c9bdb4", "#d0c5be", "#d7cdc8", "#ded5d2",
+             "#e5dddc", "#ece5e6", "#f3edf0", "#ffffff"),
+            delay=1600, interval=80, item_id=_text_id,
         )
     # end def
 
     def get_available_box(self):
         if self.is_full():
             raise GG.GridError("no more room in grid")
-        else:
-            _at = self.matrix.get_object_at
-            while True:
-                _row = random.randrange(self.rows)
-                _column = random.randrange(self.columns)
-                if not _at(_row, _column):
-                    break
-                # end if
-            # end while
-            return (_row, _column)
         # end if - no more room
+        return self.board.get_available_box()
     # end def
 
     def init_widget(self, **kw):
         self.__score_cvar = tk.IntVar()
         self.__score_callback = None
+        self.__board = GB.Game2048Board(
+            self.rows, self.columns, rng=kw.get("rng")
+        )
+        # board bitboard the canvas tiles currently show
+        self.__rendered = self.__board.bitboard
+    # end def
+
+    def is_full(self):
+        return self.board.is_full()
     # end def
 
     def move_tile(self, tile, row, column):
@@ -162,132 +179,39 @@ class Game2048Grid (GG.GameGrid):
         # end if
     # end def
 
-    def move_tiles_down(self):
+    def move_tiles(self, direction):
+        # moves may come faster than animations: finish them first
+        self.animator.skip()
+        self.sync_tiles()
         _at = self.matrix.get_object_at
-        _acted = False
-        for _column in range(self.columns):
-            for _row in range(self.rows - 1, -1, -1):
-                _tile1 = _at(_row, _column)
-                if _tile1:
-                    for _row2 in range(_row - 1, -1, -1):
-                        _tile2 = _at(_row2, _column)
-                        if self.fuse_tiles(_tile1, _tile2):
-                            _acted = True
-                        # end if
-                        if _tile2:
-                            break
-                    # end for - next tile
-                # end if - tile
-            # end for - fusions
-            _empty = None
-            for _row in range(self.rows - 1, -1, -1):
-                _tile1 = _at(_row, _column)
-                if not _tile1 and not _empty:
-                    _empty = (_row, _column)
-                elif _tile1 and _empty:
-                    self.move_tile(_tile1, *_empty)
-                    _empty = (_empty[0] - 1, _column)
-                    _acted = True
-                # end if
-            # end for - scrollings
-        # end for - row
+        _trace = list()
+        _acted = self.board.move(direction, trace=_trace)
+        for _event in _trace:
+            if _event[0] == "fuse":
+                self.fuse_tiles(_at(*_event[1]), _at(*_event[2]))
+            else:
+                self.move_tile(_at(*_event[1]), *_event[2])
+            # end if
+        # end for - replay board events
+        self.__rendered = self.board.bitboard
         self.next_tile(acted=_acted)
+        return _acted
+    # end def
+
+    def move_tiles_down(self):
+        return self.move_tiles("down")
     # end def
 
     def move_tiles_left(self):
-        _at = self.matrix.get_object_at
-        _acted = False
-        for _row in range(self.rows):
-            for _column in range(self.columns - 1):
-                _tile1 = _at(_row, _column)
-                if _tile1:
-                    for _col in range(_column + 1, self.columns):
-                        _tile2 = _at(_row, _col)
-                        if self.fuse_tiles(_tile1, _tile2):
-                            _acted = True
-                        # end if
-                        if _tile2:
-                            break
-                    # end for - next tile
-                # end if - tile
-            # end for - fusions
-            _empty = None
-            for _column in range(self.columns):
-                _tile1 = _at(_row, _column)
-                if not _tile1 and not _empty:
-                    _empty = (_row, _column)
-                elif _tile1 and _empty:
-                    self.move_tile(_tile1, *_empty)
-                    _empty = (_row, _empty[1] + 1)
-                    _acted = True
-                # end if
-            # end for - scrollings
-        # end for - row
-        self.next_tile(acted=_acted)
+        return self.move_tiles("left")
     # end def
 
     def move_tiles_right(self):
-        _at = self.matrix.get_object_at
-        _acted = False
-        for _row in range(self.rows):
-            for _column in range(self.columns - 1, -1, -1):
-                _tile1 = _at(_row, _column)
-                if _tile1:
-                    for _col in range(_column - 1, -1, -1):
-                        _tile2 = _at(_row, _col)
-                        if self.fuse_tiles(_tile1, _tile2):
-                            _acted = True
-                        # end if
-                        if _tile2:
-                            break
-                    # end for - next tile
-                # end if - tile
-            # end for - fusions
-            _empty = None
-            for _column in range(self.columns - 1, -1, -1):
-                _tile1 = _at(_row, _column)
-                if not _tile1 and not _empty:
-                    _empty = (_row, _column)
-                elif _tile1 and _empty:
-                    self.move_tile(_tile1, *_empty)
-                    _empty = (_row, _empty[1] - 1)
-                    _acted = True
-                # end if
-            # end for - scrollings
-        # end for - row
-        self.next_tile(acted=_acted)
+        return self.move_tiles("right")
     # end def
 
     def move_tiles_up(self):
-        _at = self.matrix.get_object_at
-        _acted = False
-        for _column in range(self.columns):
-            for _row in range(self.rows - 1):
-                _tile1 = _at(_row, _column)
-                if _tile1:
-                    for _row2 in range(_row + 1, self.rows):
-                        _tile2 = _at(_row2, _column)
-                        if self.fuse_tiles(_tile1, _tile2):
-                            _acted = True
-                        # end if
-                        if _tile2:
-                            break
-                    # end for - next tile
-                # end if - tile
-            # end for - fusions
-            _empty = None
-            for _row in range(self.rows):
-                _tile1 = _at(_row, _column)
-                if not _tile1 and not _empty:
-                    _empty = (_row, _column)
-                elif _tile1 and _empty:
-                    self.move_tile(_tile1, *_empty)
-                    _empty = (_empty[0] + 1, _column)
-                    _acted = True
-                # end if
-            # end for - scrollings
-        # end for - row
-        self.next_tile(acted=_acted)
+        return self.move_tiles("up")
     # end def
 
     def next_tile(self, tk_event=None, *args, **kw):
@@ -300,36 +224,83 @@ class Game2048Grid (GG.GameGrid):
     # end def
 
     def no_more_hints(self):
-        if self.is_full():
-            _at = self.matrix.get_object_at
-            for _row in range(self.rows):
-                for _column in range(self.columns):
-                    _tile1 = _at(_row, _column)
-                    _tile2 = _at(_row, _column + 1)
-                    _tile3 = _at(_row + 1, _column)
-                    if _tile1 and (
-                        (_tile2 and _tile1.value == _tile2.value) or
-                            (_tile3 and _tile1.value == _tile3.value)):
-                        return False
-                    # end if
-                # end for - columns
-            # end for - rows
-            return True
-        # end if - no more room
-        return False
+        return self.board.no_more_hints()
     # end def
 
     def pop_tile(self, tk_event=None, *args, **kw):
-        if not self.is_full():
-            _value = random.choice([2, 4, 2, 2])
-            _row, _column = self.get_available_box()
+        self.sync_tiles()
+        _popped = self.board.pop_tile()
+        if _popped:
+            _row, _column, _value = _popped
             _tile = Game2048GridTile(self, _value, _row, _column)
             _tile.animate_show()
             self.register_tile(_tile.id, _tile)
             self.matrix.add(_tile, *_tile.row_column, raise_error=True)
+            self.__rendered = self.board.bitboard
         # end if - room in grid
     # end def
 
+    def render_board(self, tk_event=None, *args, **kw):
+        # shows the board at once, no animation: used when the board
+        # moved ahead without the canvas
+        self.animator.skip()
+        self.sync_tiles()
+        self.update_score(self.board.score, mode="set")
+        if self.no_more_hints():
+            self.game_over()
+        # end if
+    # end def
+
+    def render_diff(self, before, after):
+        """
+            updates tiles from bitboard snapshot @before to @after,
+            touching only the cells that differ: a value change is a
+            recolour/retext, appearing and vanishing tiles take and
+            give back pooled canvas items;
+
+            @after is the board's current bitboard: tile values come
+            from its cells, which are not capped at 32768;
+        """
+        _at = self.matrix.get_object_at
+        _cells = self.board.cells
+        _changes = before ^ after
+        if self.board.saturated:
+            # capped ranks hide merges above 32768: check those too
+            for _index in range(16):
+                if (after >> (4 * _index)) & 0xF == BB.MAX_RANK:
+                    _changes |= 0xF << (4 * _index)
+                # end if
+            # end for
+        # end if
+        _index = 0
+        while _changes:
+            if _changes & 0xF:
+                _row, _column = divmod(_index, self.columns)
+                # true value, the nibble may be capped
+                _value = _cells[_row][_column]
+                _tile = _at(_row, _column)
+                if _tile and _value:
+                    if _tile.value != _value:
+                        _tile.value = _value
+                        _tile.update_display()
+                    # end if
+                elif _tile:
+                    self.matrix.remove_object_at(_row, _column)
+                    self.remove_tile(_tile.id)
+                    _tile.animate_remove()
+                elif _value:
+                    _tile = Game2048GridTile(self, _value, _row, _column)
+                    _tile.show()
+                    self.register_tile(_tile.id, _tile)
+                    self.matrix.add(_tile, _row, _column, raise_error=True)
+                # end if
+            # end if
+            _changes >>= 4
+            _index += 1
+        # end while
+        self.__rendered = after
+    # end def
+
     def set_score_callback(self, callback, raise_error=False):
         if callable(callback):
             self.__score_callback = callback
@@ -340,6 +311,14 @@ class Game2048Grid (GG.GameGrid):
         # end if
     # end def
 
+    def sync_tiles(self):
+        # catches tiles up with the board, if it moved on its own
+        _board = self.board.bitboard
+        if _board != self.__rendered:
+            self.render_diff(self.__rendered, _board)
+        # end if
+    # end def
+
     def tiles_match(self, tile1, tile2):
         return tile1 and tile2 and tile1.value == tile2.value
     # end def
@@ -392,39 +371,36 @@ class Game2048GridTile (GG.GridTile):
     }
 
     def animate_move_to(self, row, column):
+        # one call moves rectangle and value text together
         _x0, _y0 = self.xy_origin
         _x1, _y1 = self.cell_size.xy_left_top(row, column)
-        self.owner.move(self.tag, (_x1 - _x0), (_y1 - _y0))
+        self.owner.move(
+            self.owner.item_pool.pair_tag(self.id),
+            (_x1 - _x0), (_y1 - _y0),
+        )
         self.row, self.column = row, column
     # end def
 
     def animate_tile_popup(self, value):
-        _x0, _y0 = self.xy_center
-        self.owner.scale(self.id, _x0, _y0, value, value)
+        # pooled items may already belong to another tile
+        if self.id is not None:
+            _x0, _y0 = self.xy_center
+            self.owner.scale(self.id, _x0, _y0, value, value)
+        # end if
     # end def
 
     def animate_remove(self):
-        self.owner.delete(self.tag)
+        if self.id is not None:
+            self.owner.item_pool.release((self.id, self.value_id))
+            self.id = self.value_id = None
+        # end if
     # end def
 
     def animate_show(self):
-        _x, _y = self.xy_origin
-        _width, _height = self.size
-        _bg, _fg = self.get_value_colors()
-        self.id = self.owner.create_rectangle(
-            _x, _y, (_x + _width), (_y + _height),
-            fill=_bg, width=0, tags=(self.tag, "tiles"),
-        )
-        _font = self.get_value_font()
-        _x, _y = self.xy_center
-        self.value_id = self.owner.create_text(
-            _x, _y, text=str(self.value),
-            fill=_fg, font=_font, tags=(self.tag, "values"),
-        )
-        _anim_tile = GG.GridAnimation()
-        _anim_tile.register(self.animate_tile_popup)
-        _anim_tile.start(
-            interval=50, sequence=(6.0 / 5.0, 6.0 / 5.0, 5.0 / 6.0, 5.0 / 6.0),
+        self.show()
+        self.owner.animator.add(
+            self.animate_tile_popup,
+            (6.0 / 5.0, 6.0 / 5.0, 5.0 / 6.0, 5.0 / 6.0), interval=50,
         )
     # end def
 
@@ -436,6 +412,19 @@ class Game2048GridTile (GG.GridTile):
         return self.FONTS.get(self.value, "sans 10 bold")
     # end def
 
+    def show(self):
+        _owner = self.owner
+        self.id, self.value_id = _owner.item_pool.acquire()
+        _x, _y = self.xy_origin
+        _width, _height = self.size
+        _owner.coords(self.id, _x, _y, (_x + _width), (_y + _height))
+        _owner.coords(self.value_id, *self.xy_center)
+        self.update_display()
+        _pair = _owner.item_pool.pair_tag(self.id)
+        _owner.itemconfigure(_pair, state=tk.NORMAL)
+        _owner.tag_raise(_pair)
+    # end def
+
     def update_display(self, tk_event=None, *args, **kw):
         _bg, _fg = self.get_value_colors()
         self.owner.itemconfigure(self.id, fill=_bg)
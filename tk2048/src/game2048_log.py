@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import logging
+import time
+
+
+# library style: silent unless the application configures it
+logger = logging.getLogger("tk2048")
+logger.addHandler(logging.NullHandler())
+
+FORMAT = "%(asctime)s %(name)s %(levelname)s %(message)s"
+
+# handler installed by configure(), replaced by the next call
+_handler = None
+
+
+def configure(level=None, stream=None, fmt=FORMAT):
+    """
+        sends "tk2048" log records to @stream (default: stderr) from
+        @level on (name or number); does nothing if @level is None,
+        which keeps logging off;
+
+        calling it again replaces the handler it installed before,
+        so records are never emitted twice;
+    """
+    global _handler
+    if level is None:
+        return
+    # end if
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    # end if
+    if _handler is not None:
+        logger.removeHandler(_handler)
+    # end if
+    _handler = logging.StreamHandler(stream)
+    _handler.setFormatter(logging.Formatter(fmt))
+    logger.addHandler(_handler)
+    logger.setLevel(level)
+# end def
+
+
+class Game2048MoveLog:
+    """
+        structured per-move log records: begin_move() once per move
+        decides whether that move gets logged, record() then adds
+        (event, fields) records to it;
+
+        only one move out of @sample_every is logged, and at most
+        @max_per_second of them (None for no limit); when the logger
+        is disabled for @level, begin_move() returns False at once
+        and callers skip building their fields, so nothing is ever
+        formatted;
+    """
+
+    def __init__(self, name="tk2048.moves", level=logging.DEBUG,
+                 sample_every=1, max_per_second=None):
+        self.logger = logging.getLogger(name)
+        self.level = level
+        self.sample_every = max(1, int(sample_every))
+        self.max_per_second = max_per_second
+        self.moves = 0
+        self.dropped = 0
+        self.sampled = False
+        self.__window = 0.0
+        self.__window_count = 0
+    # end def
+
+    def _rate_ok(self):
+        if not self.max_per_second:
+            return True
+        # end if
+        _now = time.monotonic()
+        if _now - self.__window >= 1.0:
+            self.__window = _now
+            self.__window_count = 0
+        # end if
+        if self.__window_count >= self.max_per_second:
+            self.dropped += 1
+            return False
+        # end if
+        self.__window_count += 1
+        return True
+    # end def
+
+    def begin_move(self):
+        self.moves += 1
+        self.sampled = (
+            self.logger.isEnabledFor(self.level) and
+            not self.moves % self.sample_every and
+            self._rate_ok()
+        )
+        return self.sampled
+    # end def
+
+    def record(self, event, **fields):
+        if self.sampled:
+            # fields only get formatted if a handler emits the record
+            self.logger.log(
+                self.level, "move=%d event=%s %r", self.moves, event,
+                fields, extra=dict(move=self.moves, event=event,
+                                   fields=fields),
+            )
+        # end if
+    # end def
+
+# end class
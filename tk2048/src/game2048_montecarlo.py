@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+from . import game2048_batch as GBT
+from . import game2048_bitboard as BB
+from . import game2048_random as GR
+from .game2048_ai import empty_shifts
+from .game2048_board import DIRECTIONS
+
+
+# legal directions for each game2048_bitboard.legal_moves() mask
+_LEGAL = [
+    tuple(
+        _direction for _direction in DIRECTIONS
+        if _mask & BB.DIRECTION_BITS[_direction]
+    )
+    for _mask in range(16)
+]
+
+
+def playout(board, rng, max_moves=None):
+    """
+        plays on from @board, as left by a move: spawns a tile with
+        @rng, then plays uniformly random legal moves and spawns
+        until game over (or @max_moves);
+
+        returns the score gained on the way;
+    """
+    _score = 0
+    _moves = 0
+    while True:
+        _shifts = empty_shifts(board)
+        _rank = 2 if rng.randrange(4) == 1 else 1   # choice([2, 4, 2, 2])
+        board |= _rank << _shifts[rng.randrange(len(_shifts))]
+        _legal = _LEGAL[BB.legal_moves(board)]
+        if not _legal or (max_moves is not None and _moves >= max_moves):
+            break
+        # end if
+        board, _gain = BB.move(board, _legal[rng.randrange(len(_legal))])
+        _score += _gain
+        _moves += 1
+    # end while
+    return _score
+# end def
+
+
+class Game2048MonteCarlo:
+    """
+        flat Monte Carlo player: each legal move is followed by
+        @playouts random games to the end, the move with the best
+        mean score (move gain included) wins;
+
+        @playouts is the latency/strength knob; playouts run all at
+        once in a game2048_batch.Game2048Batch when numpy is there
+        (and @vectorized), one by one on bitboards otherwise;
+    """
+
+    PLAYOUTS = 100
+    MAX_MOVES = None        # playout length cap, None: to the end
+
+    def __init__(self, playouts=PLAYOUTS, max_moves=MAX_MOVES, seed=None,
+                 vectorized=True):
+        self.playouts = max(1, int(playouts))
+        self.max_moves = max_moves
+        self.rng = GR.Game2048Random(seed)
+        self.vectorized = vectorized and GBT.np is not None
+        self.playouts_done = 0
+        self.__batch = None
+    # end def
+
+    def _batch_scores(self, starts, abort):
+        # mean playout score of each start board, all in one batch
+        _np = GBT.np
+        _size = len(starts) * self.playouts
+        if self.__batch is None or self.__batch.size != _size:
+            self.__batch = GBT.Game2048Batch(_size, self.rng.next_u64())
+        # end if
+        _batch = self.__batch
+        _batch.set_bitboards(
+            [_start for _start in starts for _n in range(self.playouts)]
+        )
+        # starts are boards right after a move: spawn first
+        _batch.spawn(_np.ones(_size, dtype=bool))
+        _batch.done[:] = ~GBT.has_moves(_batch.boards)
+        # moves that changed each board, as playout() counts them
+        _moves = _np.zeros(_size, dtype=_np.int64)
+        while True:
+            if self.max_moves is not None:
+                _batch.done |= _moves >= self.max_moves
+            # end if
+            if _batch.done.all():
+                break
+            elif abort is not None and abort():
+                return None
+            # end if
+            # a move that changes nothing is just drawn again next
+            # step: same odds as picking among legal moves
+            _moves += _batch.step(_batch.rng.integers(0, 4, _size))[2]
+        # end while
+        self.playouts_done += _size
+        return list(
+            _batch.scores.reshape(len(starts), self.playouts).mean(axis=1)
+        )
+    # end def
+
+    def _serial_scores(self, starts, abort):
+        _scores = []
+        for _start in starts:
+            _total = 0
+            for _n in range(self.playouts):
+                if abort is not None and abort():
+                    return None
+                # end if
+                _total += playout(_start, self.rng, self.max_moves)
+            # end for
+            _scores.append(_total / self.playouts)
+            self.playouts_done += self.playouts
+        # end for
+        return _scores
+    # end def
+
+    def get_move(self, board, abort=None):
+        """
+            returns the direction with the best mean playout score
+            for @board (bitboard int), or None if no move is left or
+            @abort() stopped the search;
+        """
+        _directions = []
+        _starts = []
+        _gains = []
+        for _direction in _LEGAL[BB.legal_moves(board)]:
+            _next, _gain = BB.move(board, _direction)
+            _directions.append(_direction)
+            _starts.append(_next)
+            _gains.append(_gain)
+        # end for
+        if not _directions:
+            return None
+        # end if
+        if self.vectorized:
+            _scores = self._batch_scores(_starts, abort)
+        else:
+            _scores = self._serial_scores(_starts, abort)
+        # end if
+        if _scores is None:
+            return None
+        # end if
+        _best, _best_score = None, None
+        for _direction, _gain, _score in zip(_directions, _gains, _scores):
+            if _best is None or _gain + _score > _best_score:
+                _best, _best_score = _direction, _gain + _score
+            # end if
+        # end for
+        return _best
+    # end def
+
+# end class
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import array
+import mmap
+import os
+import struct
+import zlib
+
+from . import game2048_bitboard as BB
+from . import game2048_random as GR
+from . import game2048_tables as GT
+from .game2048_ai import empty_shifts
+from .game2048_board import DIRECTIONS
+
+
+# cells are (row, column); every tuple must fit in two neighbour
+# rows, so that its index comes from two row lookups
+TUPLES_6 = (
+    ((0, 0), (0, 1), (0, 2), (0, 3), (1, 0), (1, 1)),
+    ((1, 0), (1, 1), (1, 2), (1, 3), (2, 0), (2, 1)),
+    ((0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)),
+    ((1, 0), (1, 1), (1, 2), (2, 0), (2, 1), (2, 2)),
+)
+TUPLES_4 = (
+    ((0, 0), (0, 1), (0, 2), (0, 3)),
+    ((1, 0), (1, 1), (1, 2), (1, 3)),
+    ((0, 0), (0, 1), (1, 0), (1, 1)),
+    ((0, 1), (0, 2), (1, 1), (1, 2)),
+    ((1, 1), (1, 2), (2, 1), (2, 2)),
+)
+
+MAGIC = b"T2048NT"
+VERSION = 1
+HEADER_SIZE = 4096          # weights start on a page boundary
+_HEADER = struct.Struct("<7sBHH")   # magic, version, tuples, cells
+
+
+class NTupleError (Exception):
+    pass
+# end class
+
+
+def _row_tables(cells, row):
+    # row value -> part of the tuple index held by @row's cells
+    _parts = [
+        (_column, _k) for _k, (_row, _column) in enumerate(cells)
+        if _row == row
+    ]
+    _table = array.array("I", bytes(4 * 65536))
+    for _value in range(65536):
+        _index = 0
+        for _column, _k in _parts:
+            _index |= ((_value >> (4 * _column)) & 0xF) << (4 * _k)
+        # end for
+        _table[_value] = _index
+    # end for
+    return _table
+# end def
+
+
+def _top_row(cells):
+    return min(_row for _row, _column in cells)
+# end def
+
+
+def load_tables(tuples, force=False):
+    """
+        row index tables of @tuples, "low<t>" for the top row of
+        tuple #t and "high<t>" for the row below, from the table
+        cache (see game2048_tables);
+    """
+    def _build():
+        _arrays = dict()
+        for _t, _cells in enumerate(tuples):
+            _top = _top_row(_cells)
+            _arrays["low{}".format(_t)] = _row_tables(_cells, _top)
+            _arrays["high{}".format(_t)] = _row_tables(_cells, _top + 1)
+        # end for
+        return _arrays
+    # end def
+    _key = repr(tuples)
+    return GT.load(
+        "ntuple-{:08x}".format(zlib.crc32(_key.encode())), _build,
+        key=_key, force=force, depends=(_row_tables, _top_row),
+    )
+# end def
+
+
+def header(tuples):
+    # file header: magic, version, tuple count and length, then the
+    # cells (4 * row + column, 0xFF pads shorter tuples)
+    _length = max(len(_cells) for _cells in tuples)
+    _data = _HEADER.pack(MAGIC, VERSION, len(tuples), _length)
+    for _cells in tuples:
+        _data += bytes(4 * _row + _column for _row, _column in _cells)
+        _data += b"\xff" * (_length - len(_cells))
+    # end for
+    return _data.ljust(HEADER_SIZE, b"\0")
+# end def
+
+
+def symmetries(board):
+    """
+        rows (4 ints of 16 bits) of the 8 rotations/reflections of
+        @board, so tuples see every orientation;
+    """
+    _rows = [(board >> _shift) & BB.ROW_MASK for _shift in (0, 16, 32, 48)]
+    _transposed = BB.transpose(board)
+    _columns = [
+        (_transposed >> _shift) & BB.ROW_MASK for _shift in (0, 16, 32, 48)
+    ]
+    _result = []
+    for _lines in (_rows, _columns):
+        _mirror = [BB.ROW_REVERSE[_line] for _line in _lines]
+        _result.append(_lines)
+        _result.append(_lines[::-1])
+        _result.append(_mirror)
+        _result.append(_mirror[::-1])
+    # end for
+    return _result
+# end def
+
+
+class Game2048NTuple:
+    """
+        n-tuple network: the value of a bitboard is the sum, over
+        @tuples and the 8 board symmetries, of one float32 weight
+        picked by the ranks under the tuple cells;
+
+        weights are a flat typed array, memory-mapped when the
+        network is open()ed from a file: startup does not read them;
+    """
+
+    def __init__(self, tuples=TUPLES_6, weights=None):
+        self.tuples = tuple(tuple(map(tuple, _cells)) for _cells in tuples)
+        for _cells in self.tuples:
+            _rows = sorted(set(_row for _row, _column in _cells))
+            if not (4 <= len(_cells) <= 6) or _rows[-1] - _rows[0] > 1 \
+                    or _rows[0] > 2:
+                raise NTupleError(
+                    "tuple {} must have 4 to 6 cells in two neighbour rows"
+                    .format(_cells)
+                )
+            # end if
+        # end for
+        _tables = load_tables(self.tuples)
+        self.__lookups = []
+        _offset = 0
+        for _t, _cells in enumerate(self.tuples):
+            self.__lookups.append((
+                _offset, _top_row(_cells), _tables["low{}".format(_t)],
+                _tables["high{}".format(_t)],
+            ))
+            _offset += 16 ** len(_cells)
+        # end for
+        self.size = _offset
+        self.features = 8 * len(self.tuples)
+        if weights is None:
+            weights = array.array("f", bytes(4 * self.size))
+        elif len(weights) != self.size:
+            raise NTupleError(
+                "{} weights for a {} weights network"
+                .format(len(weights), self.size)
+            )
+        # end if
+        self.weights = weights
+        self.path = None
+        self.__mmap = None
+    # end def
+
+    def __reduce__(self):
+        # a mapped network travels as its file path, e.g. to pool
+        # workers, which map the same pages
+        if self.__mmap is not None:
+            return (Game2048NTuple.open, (self.path, self.tuples))
+        # end if
+        return (Game2048NTuple, (self.tuples, self.weights))
+    # end def
+
+    @classmethod
+    def open(cls, path, tuples=TUPLES_6, writable=False, create=False):
+        """
+            maps the network file @path, made by save() or by
+            @create (all zero weights), read-only unless @writable;
+        """
+        if create and not os.path.exists(path):
+            cls.create(path, tuples)
+        # end if
+        with open(path, "r+b" if writable else "rb") as _file:
+            _header = _file.read(HEADER_SIZE)
+            _tuples = cls.parse_header(_header)
+            _mmap = mmap.mmap(
+                _file.fileno(), 0,
+                access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ,
+            )
+        # end with
+        _weights = memoryview(_mmap)[HEADER_SIZE:].cast("f")
+        _network = cls(_tuples, _weights)
+        _network.path = os.path.abspath(path)
+        _network.__mmap = _mmap
+        return _network
+    # end def
+
+    @classmethod
+    def create(cls, path, tuples=TUPLES_6):
+        # zero weights file, sparse where the filesystem allows it
+        _size = sum(16 ** len(_cells) for _cells in tuples)
+        with open(path, "wb") as _file:
+            _file.write(header(tuples))
+            _file.truncate(HEADER_SIZE + 4 * _size)
+        # end with
+    # end def
+
+    @staticmethod
+    def parse_header(header):
+        if len(header) < _HEADER.size:
+            raise NTupleError("truncated n-tuple file")
+        # end if
+        _magic, _version, _count, _length = _HEADER.unpack_from(header)
+        if _magic != MAGIC:
+            raise NTupleError("not an n-tuple network file")
+        elif _version != VERSION:
+            raise NTupleError(
+                "unsupported n-tuple file version {}".format(_version)
+            )
+        # end if
+        _cells = header[_HEADER.size:_HEADER.size + _count * _length]
+        return tuple(
+            tuple(
+                divmod(_cell, 4) for _cell in
+                _cells[_t * _length:(_t + 1) * _length] if _cell != 0xFF
+            )
+            for _t in range(_count)
+        )
+    # end def
+
+    def close(self):
+        if self.__mmap is not None:
+            self.weights.release()
+            self.__mmap.close()
+            self.__mmap = None
+        # end if
+    # end def
+
+    def evaluate(self, board):
+        _weights = self.weights
+        _lookups = self.__lookups
+        _total = 0.0
+        for _rows in symmetries(board):
+            for _offset, _top, _low, _high in _lookups:
+                _total += _weights[
+                    _offset + (_low[_rows[_top]] | _high[_rows[_top + 1]])
+                ]
+            # end for
+        # end for
+        return _total
+    # end def
+
+    def flush(self):
+        if self.__mmap is not None:
+            self.__mmap.flush()
+        # end if
+    # end def
+
+    def save(self, path):
+        with open(path, "wb") as _file:
+            _file.write(header(self.tuples))
+            _file.write(memoryview(self.weights).cast("B"))
+        # end with
+    # end def
+
+    def update(self, board, delta):
+        # spreads @delta over every feature weight of @board
+        _weights = self.weights
+        _lookups = self.__lookups
+        _delta = delta / self.features
+        for _rows in symmetries(board):
+            for _offset, _top, _low, _high in _lookups:
+                _index = _offset + (_low[_rows[_top]] | _high[_rows[_top + 1]])
+                _weights[_index] += _delta
+            # end for
+        # end for
+    # end def
+
+# end class
+
+
+class Game2048TDTrainer:
+    """
+        TD(0) self-play on afterstates (boards right after a move,
+        before the spawn): the greedy move maximizes gain + V(after),
+        then V(previous after) moves towards gain + V(after);
+
+        V ends up estimating the score still to come after a move:
+        search with it as game2048_ai.Game2048Expectimax(evaluator=
+        network.evaluate, afterstates=True);
+    """
+
+    LEARNING_RATE = 0.1
+
+    def __init__(self, network, learning_rate=LEARNING_RATE, seed=None):
+        self.network = network
+        self.learning_rate = learning_rate
+        self.rng = GR.Game2048Random(seed)
+    # end def
+
+    def _spawn(self, board):
+        _shifts = empty_shifts(board)
+        _rank = 2 if self.rng.randrange(4) == 1 else 1  # choice([2, 4, 2, 2])
+        return board | (_rank << _shifts[self.rng.randrange(len(_shifts))])
+    # end def
+
+    def best_afterstate(self, board):
+        # (direction, gain, afterstate) of the greedy move, or None
+        _evaluate = self.network.evaluate
+        _best, _best_value = None, None
+        for _direction in DIRECTIONS:
+            _after, _gain = BB.move(board, _direction)
+            if _after != board:
+                _value = _gain + _evaluate(_after)
+                if _best is None or _value > _best_value:
+                    _best, _best_value = (_direction, _gain, _after), _value
+                # end if
+            # end if
+        # end for
+        return _best
+    # end def
+
+    def play_game(self):
+        """
+            plays and learns one game, returns (score, max rank,
+            moves);
+        """
+        _network = self.network
+        _rate = self.learning_rate
+        _board = self._spawn(self._spawn(0))
+        _previous = None
+        _score = 0
+        _moves = 0
+        while True:
+            _best = self.best_afterstate(_board)
+            if _previous is not None:
+                _target = 0.0
+                if _best is not None:
+                    _target = _best[1] + _network.evaluate(_best[2])
+                # end if
+                _network.update(
+                    _previous, _rate * (_target - _network.evaluate(_previous))
+                )
+            # end if
+            if _best is None:
+                break
+            # end if
+            _direction, _gain, _previous = _best
+            _score += _gain
+            _moves += 1
+            _board = self._spawn(_previous)
+        # end while
+        return (_score, BB.max_rank(_board), _moves)
+    # end def
+
+# end class
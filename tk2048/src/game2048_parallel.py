@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import multiprocessing
+import time
+
+from . import game2048_ai as GA
+from . import game2048_bitboard as BB
+from .game2048_board import DIRECTIONS
+
+
+# per process state of pool workers
+_player = None
+_cancel = None
+
+
+def _init_worker(cancel, cache_entries, evaluator, afterstates):
+    global _player, _cancel
+    _player = GA.Game2048Expectimax(
+        time_budget=None, cache_entries=cache_entries, evaluator=evaluator,
+        afterstates=afterstates,
+    )
+    _cancel = cancel
+# end def
+
+
+def _search_task(task):
+    # iterative deepening of a block of root children, so that each
+    # depth starts from the cache the shallower ones filled, and
+    # neighbour children share their transpositions: returns each
+    # child's values at depths 1, 2, ... finished before a stop
+    _children, _depth, _deadline, _generation = task
+    _nodes = _player.nodes
+    _values = [[] for _child in _children]
+    for _child_depth in range(1, _depth + 1):
+        for _k, (_board, _probability) in enumerate(_children):
+            _value = _player.search_node(
+                _board, _child_depth, _probability, deadline=_deadline,
+                abort=lambda: _cancel.value != _generation,
+            )
+            if _value is None:
+                return (_values, _player.nodes - _nodes)
+            # end if
+            _values[_k].append(_value)
+        # end for
+    # end for
+    return (_values, _player.nodes - _nodes)
+# end def
+
+
+class Game2048ParallelExpectimax (GA.Game2048Expectimax):
+    """
+        expectimax split at the root over a process pool: every
+        (move, spawn) child of the root is searched in a worker, then
+        chance nodes are averaged and the best move picked here, so
+        results match Game2048Expectimax;
+
+        each worker deepens its own block of children, with a warm
+        cache from one depth to the next; the move comes from the
+        deepest depth every child finished before the shared
+        deadline, or before @abort() returned True;
+
+        workers are "spawn"ed, never forked from a process running
+        Tk and threads; @evaluator goes to them pickled, so it must
+        be picklable, as game2048_eval.Game2048Evaluator and mapped
+        game2048_ntuple networks are; the pool starts on first use,
+        close() stops it;
+    """
+
+    CONTEXT = "spawn"
+    POLL_INTERVAL = 0.005   # seconds between deadline/abort checks
+
+    def __init__(self, depth=GA.Game2048Expectimax.DEPTH,
+                 time_budget=GA.Game2048Expectimax.TIME_BUDGET,
+                 cache_entries=GA.Game2048Expectimax.CACHE_ENTRIES,
+                 workers=None, evaluator=None, afterstates=False):
+        GA.Game2048Expectimax.__init__(
+            self, depth=depth, time_budget=time_budget,
+            cache_entries=cache_entries, evaluator=evaluator,
+            afterstates=afterstates,
+        )
+        self.cache_entries = cache_entries
+        self.evaluator = evaluator
+        self.workers = workers or multiprocessing.cpu_count()
+        self.__pool = None
+        self.__cancel = None
+    # end def
+
+    def _children(self, board):
+        # (direction, odds, spawn count, child board, probability,
+        # move gain) of root, in the order Game2048Expectimax visits
+        _children = []
+        for _direction in DIRECTIONS:
+            _next, _gain = BB.move(board, _direction)
+            if _next == board:
+                continue
+            # end if
+            _shifts = GA.empty_shifts(_next)
+            if not _shifts:
+                _children.append((_direction, 1.0, 1, _next, 1.0, _gain))
+                continue
+            # end if
+            _count = len(_shifts)
+            for _shift in _shifts:
+                for _rank, _odds in GA.SPAWN_ODDS:
+                    _children.append((
+                        _direction, _odds, _count,
+                        _next | (_rank << _shift), _odds / _count, _gain,
+                    ))
+                # end for
+            # end for
+        # end for
+        return _children
+    # end def
+
+    def _pool(self):
+        if self.__pool is None:
+            _context = multiprocessing.get_context(self.CONTEXT)
+            self.__cancel = _context.RawValue("l", 0)
+            self.__pool = _context.Pool(
+                self.workers, initializer=_init_worker,
+                initargs=(
+                    self.__cancel, self.cache_entries, self.evaluator,
+                    self.afterstates,
+                ),
+            )
+        # end if
+        return self.__pool
+    # end def
+
+    def _search_children(self, children, depth, deadline, abort):
+        """
+            lists of the values of @children at depths 1 to
+            @depth - 1 below them, each list cut where that child's
+            search stopped;
+
+            children go in one contiguous block per worker: blocks
+            keep the children of a move together, so they share
+            their cache as in Game2048Expectimax;
+        """
+        _pool = self._pool()
+        self.__cancel.value += 1
+        _generation = self.__cancel.value
+        _blocks = min(self.workers, len(children))
+        _bounds = [
+            len(children) * _block // _blocks
+            for _block in range(_blocks + 1)
+        ]
+        _results = _pool.imap(
+            _search_task,
+            [
+                (
+                    [
+                        (_child[3], _child[4]) for _child in
+                        children[_bounds[_block]:_bounds[_block + 1]]
+                    ],
+                    depth - 1, deadline, _generation,
+                )
+                for _block in range(_blocks)
+            ],
+        )
+        _values = []
+        while len(_values) < len(children):
+            try:
+                _block_values, _nodes = _results.next(self.POLL_INTERVAL)
+            except multiprocessing.TimeoutError:
+                if (
+                    (deadline is not None and time.monotonic() > deadline)
+                        or (abort is not None and abort())):
+                    # workers stop at once, then report what they did
+                    self.__cancel.value += 1
+                # end if
+                continue
+            # end try
+            self.nodes += _nodes
+            if len(_block_values[-1]) < depth - 1:
+                # a block stopped short: no use going deeper elsewhere
+                self.__cancel.value += 1
+            # end if
+            _values.extend(_block_values)
+        # end while
+        return _values
+    # end def
+
+    def close(self):
+        if self.__pool is not None:
+            self.__cancel.value += 1
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+        # end if
+    # end def
+
+    def get_move(self, board, abort=None):
+        _started = time.monotonic()
+        _children = self._children(board)
+        if not _children:
+            return None
+        # end if
+        # depth 1 is only evaluations: not worth a trip to the pool
+        _best = self.search_root(board, 1)
+        if self.depth < 2:
+            return _best
+        # end if
+        _deadline = None
+        if self.time_budget is not None:
+            _deadline = _started + self.time_budget
+        # end if
+        _values = self._search_children(
+            _children, self.depth, _deadline, abort
+        )
+        _reached = min(len(_child_values) for _child_values in _values)
+        if not _reached:
+            return _best
+        # end if
+        # same sums, same order as _chance_node(): same floats
+        _totals = dict()
+        _counts = dict()
+        _gains = dict()
+        for _child, _child_values in zip(_children, _values):
+            _direction, _odds, _count = _child[:3]
+            _totals[_direction] = (
+                _totals.get(_direction, 0.0) +
+                _odds * _child_values[_reached - 1]
+            )
+            _counts[_direction] = _count
+            _gains[_direction] = _child[5]
+        # end for
+        _best_score = None
+        for _direction in DIRECTIONS:
+            if _direction not in _totals:
+                continue
+            # end if
+            _score = _totals[_direction] / _counts[_direction]
+            if self.afterstates:
+                _score += _gains[_direction]
+            # end if
+            if _best_score is None or _score > _best_score:
+                _best, _best_score = _direction, _score
+            # end if
+        # end for
+        return _best
+    # end def
+
+# end class
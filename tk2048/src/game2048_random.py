@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import os
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+GAMMA = 0x9E3779B97F4A7C15
+
+
+def mix64(value):
+    # splitmix64 finalizer
+    _z = value & MASK64
+    _z = ((_z ^ (_z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    _z = ((_z ^ (_z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return _z ^ (_z >> 31)
+# end def
+
+
+class Game2048Random:
+    """
+        per-game random stream, counter based: draw #n is a hash of
+        (seed, n), so the same seed replays the same game whatever
+        the speed it is played at;
+
+        fork() gives an independent stream without drawing anything;
+    """
+
+    def __init__(self, seed=None, counter=0):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "little")
+        # end if
+        self.seed = int(seed)
+        self.counter = counter
+        self.__key = mix64(self.seed + GAMMA)
+    # end def
+
+    def choice(self, sequence):
+        return sequence[self.randrange(len(sequence))]
+    # end def
+
+    def copy(self):
+        return Game2048Random(self.seed, self.counter)
+    # end def
+
+    def fork(self, stream=1):
+        return Game2048Random(mix64(self.__key ^ mix64(stream * GAMMA)))
+    # end def
+
+    def getstate(self):
+        return (self.seed, self.counter)
+    # end def
+
+    def next_u64(self):
+        self.counter += 1
+        return mix64(self.__key + self.counter * GAMMA)
+    # end def
+
+    def random(self):
+        return (self.next_u64() >> 11) * (1.0 / (1 << 53))
+    # end def
+
+    def randrange(self, start, stop=None):
+        if stop is None:
+            start, stop = 0, start
+        # end if
+        if stop <= start:
+            raise ValueError(
+                "empty range for randrange({}, {})".format(start, stop)
+            )
+        # end if
+        return start + ((self.next_u64() * (stop - start)) >> 64)
+    # end def
+
+    def setstate(self, state):
+        self.__init__(*state)
+    # end def
+
+# end class
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+# compact binary game records
+#
+# a replay file starts with MAGIC and a version byte, then holds
+# records one after the other, each starting with a tag byte:
+#
+#   1ddfcccc    move towards DIRECTIONS[dd] then spawn of a 2 (f=0)
+#               or a 4 (f=1) at cell cccc (row * 4 + column)
+#   01-fcccc    spawn only (start tiles)
+#   001000dd    move only, no spawn followed
+#   0x01        game start, seed as 8 bytes
+#   0x02        board snapshot, see SNAPSHOT
+#   0x03        game end, final snapshot
+#
+# snapshots carry a CRC32, so a reader spots damaged files and a
+# replay checks it reached the very same board
+
+import io
+import struct
+import zlib
+
+from . import game2048_bitboard as BB
+from .game2048_board import DIRECTIONS
+
+
+MAGIC = b"T2048R"
+VERSION = 1
+
+TAG_GAME = 0x01
+TAG_SNAPSHOT = 0x02
+TAG_END = 0x03
+TAG_MOVE = 0x20
+TAG_SPAWN = 0x40
+TAG_MOVE_SPAWN = 0x80
+
+SEED = struct.Struct("<Q")
+SNAPSHOT = struct.Struct("<IIQ")    # moves, score, bitboard
+CHECKSUM = struct.Struct("<I")
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+_DIRECTION_CODES = {_d: _i for _i, _d in enumerate(DIRECTIONS)}
+
+
+class ReplayError (Exception):
+    pass
+# end class
+
+
+def write_header(stream):
+    stream.write(MAGIC + bytes((VERSION,)))
+# end def
+
+
+def _spawn_bits(row, column, value):
+    if value not in (2, 4) or not (0 <= row < 4 and 0 <= column < 4):
+        raise ReplayError(
+            "can not record spawn of {} at ({}, {})"
+            .format(value, row, column)
+        )
+    # end if
+    return ((value == 4) << 4) | (row * 4 + column)
+# end def
+
+
+class Game2048Recorder:
+    """
+        writes games played on a Game2048Board to binary @stream;
+
+        set it as board.recorder and call begin_game() once the board
+        has its rng: the board then reports every move and spawn,
+        a move and the spawn that follows it take one byte together;
+
+        a checksummed snapshot is written every @snapshot_interval
+        moves and at game end; the file header is written first if
+        @header and @stream is empty, so files can be appended to;
+    """
+
+    SNAPSHOT_INTERVAL = 64
+
+    def __init__(self, stream, snapshot_interval=SNAPSHOT_INTERVAL,
+                 header=True):
+        self.stream = stream
+        self.snapshot_interval = max(1, int(snapshot_interval))
+        self.board = None
+        self.moves = 0
+        self.__pending = None
+        self.__snapshot_moves = 0
+        self.__last = (0, 0)
+        if header and stream.tell() == 0:
+            write_header(stream)
+        # end if
+    # end def
+
+    def _flush_move(self):
+        if self.__pending is not None:
+            self.stream.write(bytes((TAG_MOVE | self.__pending,)))
+            self.__pending = None
+            self._recorded()
+        # end if
+    # end def
+
+    def _recorded(self):
+        # board now matches every written record
+        self.__last = (self.board.score, self.board.bitboard)
+        if self.moves - self.__snapshot_moves >= self.snapshot_interval:
+            self.write_snapshot(TAG_SNAPSHOT)
+        # end if
+    # end def
+
+    def begin_game(self, board):
+        if board.rows != 4 or board.columns != 4:
+            raise ReplayError("replays only support 4x4 boards")
+        # end if
+        self.end_game()
+        self.board = board
+        self.moves = 0
+        self.__snapshot_moves = 0
+        self.__last = (board.score, board.bitboard)
+        self.stream.write(
+            bytes((TAG_GAME,)) + SEED.pack(board.rng.seed & MASK64)
+        )
+    # end def
+
+    def close(self):
+        self.end_game()
+        self.stream.close()
+    # end def
+
+    def end_game(self):
+        if self.board is not None:
+            self._flush_move()
+            self.write_snapshot(TAG_END)
+            self.stream.flush()
+            self.board = None
+        # end if
+    # end def
+
+    def record_move(self, direction):
+        if self.board is None:
+            return
+        # end if
+        self._flush_move()
+        self.__pending = _DIRECTION_CODES[direction]
+        self.moves += 1
+    # end def
+
+    def record_spawn(self, row, column, value):
+        if self.board is None:
+            return
+        # end if
+        _bits = _spawn_bits(row, column, value)
+        if self.__pending is not None:
+            _tag = TAG_MOVE_SPAWN | (self.__pending << 5) | _bits
+            self.__pending = None
+        else:
+            _tag = TAG_SPAWN | _bits
+        # end if
+        self.stream.write(bytes((_tag,)))
+        self._recorded()
+    # end def
+
+    def write_snapshot(self, tag=TAG_SNAPSHOT):
+        _score, _bitboard = self.__last
+        _data = SNAPSHOT.pack(self.moves, _score, _bitboard)
+        self.stream.write(
+            bytes((tag,)) + _data + CHECKSUM.pack(zlib.crc32(_data))
+        )
+        self.__snapshot_moves = self.moves
+    # end def
+
+# end class
+
+
+class Game2048ReplayReader:
+    """
+        streams events out of a replay file object opened in binary
+        mode, @chunk_size bytes at a time, so that files of any size
+        are read in constant memory;
+
+        iterating gives ("game", seed), ("move", direction),
+        ("spawn", row, column, value), ("snapshot", moves, score,
+        bitboard) and ("end", moves, score, bitboard) tuples;
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+    # end def
+
+    def __iter__(self):
+        _header = self.stream.read(len(MAGIC) + 1)
+        if _header[:len(MAGIC)] != MAGIC:
+            raise ReplayError("not a replay file")
+        elif _header[-1] != VERSION:
+            raise ReplayError(
+                "unsupported replay version {}".format(_header[-1])
+            )
+        # end if
+        _buffer = b""
+        _pos = 0
+        _read = self.stream.read
+        _record_size = 1 + SNAPSHOT.size + CHECKSUM.size
+        while True:
+            if len(_buffer) - _pos < _record_size:
+                # keep at least one whole record in buffer
+                _buffer = _buffer[_pos:]
+                _pos = 0
+                while len(_buffer) < _record_size:
+                    _chunk = _read(self.chunk_size)
+                    if not _chunk:
+                        break
+                    # end if
+                    _buffer += _chunk
+                # end while
+                if not _buffer:
+                    break
+                # end if
+            # end if
+            _tag = _buffer[_pos]
+            if _tag & (TAG_MOVE_SPAWN | TAG_SPAWN):
+                if _tag & TAG_MOVE_SPAWN:
+                    yield ("move", DIRECTIONS[(_tag >> 5) & 0x03])
+                # end if
+                yield (
+                    "spawn", (_tag >> 2) & 0x03, _tag & 0x03,
+                    2 << ((_tag >> 4) & 1)
+                )
+                _pos += 1
+            elif _tag & TAG_MOVE:
+                yield ("move", DIRECTIONS[_tag & 0x03])
+                _pos += 1
+            elif _tag == TAG_GAME:
+                _end = _pos + 1 + SEED.size
+                self._check_size(_buffer, _end)
+                yield ("game", SEED.unpack_from(_buffer, _pos + 1)[0])
+                _pos = _end
+            elif _tag in (TAG_SNAPSHOT, TAG_END):
+                _end = _pos + _record_size
+                self._check_size(_buffer, _end)
+                _data = _buffer[_pos + 1:_end - CHECKSUM.size]
+                if CHECKSUM.unpack_from(_buffer, _end - CHECKSUM.size)[0] \
+                        != zlib.crc32(_data):
+                    raise ReplayError("snapshot checksum mismatch")
+                # end if
+                yield (
+                    ("snapshot" if _tag == TAG_SNAPSHOT else "end"),
+                ) + SNAPSHOT.unpack(_data)
+                _pos = _end
+            else:
+                raise ReplayError("unknown record tag {:#04x}".format(_tag))
+            # end if
+        # end while
+    # end def
+
+    def _check_size(self, buffer, end):
+        if end > len(buffer):
+            raise ReplayError("truncated replay file")
+        # end if
+    # end def
+
+    def games(self):
+        """
+            yields (seed, events) for each game, one game in memory at
+            a time; a game cut short by the end of file has no "end"
+            event;
+        """
+        _seed, _events = None, None
+        for _event in self:
+            if _event[0] == "game":
+                if _events is not None:
+                    yield (_seed, _events)
+                # end if
+                _seed, _events = _event[1], []
+            elif _events is None:
+                raise ReplayError("event before first game record")
+            else:
+                _events.append(_event)
+                if _event[0] == "end":
+                    yield (_seed, _events)
+                    _seed, _events = None, None
+                # end if
+            # end if
+        # end for
+        if _events is not None:
+            yield (_seed, _events)
+        # end if
+    # end def
+
+# end class
+
+
+def iter_games(path, chunk_size=Game2048ReplayReader.CHUNK_SIZE):
+    # lazily yields (seed, events) for each game of replay file @path
+    with io.open(path, "rb") as _stream:
+        yield from Game2048ReplayReader(_stream, chunk_size).games()
+    # end with
+# end def
+
+
+def replay_game(events):
+    """
+        plays @events back on a bitboard, checking every snapshot;
+
+        returns (bitboard, score, moves) of the final board;
+    """
+    _board, _score, _moves = 0, 0, 0
+    for _event in events:
+        _kind = _event[0]
+        if _kind == "move":
+            _board, _gained = BB.move(_board, _event[1])
+            _score += _gained
+            _moves += 1
+        elif _kind == "spawn":
+            _kind, _row, _column, _value = _event
+            _board = BB.set_rank(
+                _board, _row, _column, _value.bit_length() - 1
+            )
+        elif _event[1:] != (_moves, _score, _board):
+            raise ReplayError(
+                "replay diverged from {} at move {}".format(_kind, _moves)
+            )
+        # end if
+    # end for
+    return (_board, _score, _moves)
+# end def
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+# versioned lookup table files, memory-mapped read-only
+#
+# a table file is one header page, then flat typed arrays:
+#
+#   MAGIC, FORMAT_VERSION, key size, table count
+#   key (what the tables were built from: a hash of the builder's
+#   code, then e.g. heuristic weights)
+#   per table: name, array typecode, CRC-32, byte offset, item count
+#
+# every process mapping the same file shares its pages through the
+# OS page cache, so extra workers cost next to no memory nor time
+
+import array
+import inspect
+import marshal
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+
+MAGIC = b"T2048TBL"
+FORMAT_VERSION = 3
+HEADER_SIZE = 4096
+ALIGNMENT = 64
+
+_HEADER = struct.Struct("<8sHII")
+_ENTRY = struct.Struct("<16ssxxxIQQ")
+
+
+def cache_dir():
+    # TK2048_TABLES, else the user cache directory
+    _dir = os.environ.get("TK2048_TABLES")
+    if not _dir:
+        _dir = os.path.join(
+            os.environ.get("XDG_CACHE_HOME") or
+            os.path.join(os.path.expanduser("~"), ".cache"),
+            "tk2048",
+        )
+    # end if
+    return _dir
+# end def
+
+
+def code_version(*functions):
+    """
+        CRC-32 of the source of @functions, as 8 hex digits: tables
+        keyed with it get rebuilt as soon as one of their builders
+        changes, no version number to bump by hand;
+
+        without sources (e.g. bytecode only installs) the bytecode
+        is hashed instead;
+    """
+    _crc = 0
+    for _function in functions:
+        try:
+            _code = inspect.getsource(_function).encode("utf-8")
+        except (OSError, TypeError):
+            _code = marshal.dumps(_function.__code__)
+        # end try
+        _crc = zlib.crc32(_code, _crc)
+    # end for
+    return "{:08x}".format(_crc)
+# end def
+
+
+def _full_key(key):
+    # arrays are stored in native layout
+    return "{}:{}".format(sys.byteorder, key).encode("utf-8")
+# end def
+
+
+def map_tables(path, key=""):
+    """
+        returns {name: read-only memoryview} out of table file @path,
+        or None if it is missing, damaged, or was built from another
+        @key;
+
+        damage means a file shorter than its header says, or a table
+        whose CRC-32 does not match: reading every page once for the
+        checks is cheap, and they stay in the shared page cache;
+    """
+    try:
+        with open(path, "rb") as _file:
+            _header = _file.read(HEADER_SIZE)
+            if len(_header) < HEADER_SIZE:
+                return None
+            # end if
+            _magic, _format, _key_size, _count = (
+                _HEADER.unpack_from(_header)
+            )
+            _key = _header[_HEADER.size:_HEADER.size + _key_size]
+            if (_magic != MAGIC or _format != FORMAT_VERSION or
+                    _key != _full_key(key)):
+                return None
+            # end if
+            _mmap = mmap.mmap(_file.fileno(), 0, access=mmap.ACCESS_READ)
+        # end with
+    except (OSError, ValueError, struct.error):
+        return None
+    # end try
+    _view = memoryview(_mmap)
+    _tables = dict()
+    _position = _HEADER.size + _key_size
+    for _n in range(_count):
+        try:
+            _name, _typecode, _crc, _offset, _items = _ENTRY.unpack_from(
+                _header, _position
+            )
+            _name = _name.rstrip(b"\0").decode()
+            _typecode = _typecode.decode()
+            _size = _items * array.array(_typecode).itemsize
+        except (struct.error, ValueError):
+            return None
+        # end try
+        _position += _ENTRY.size
+        if _offset < HEADER_SIZE or _offset + _size > len(_mmap):
+            return None     # truncated file
+        # end if
+        _data = _view[_offset:_offset + _size]
+        if zlib.crc32(_data) != _crc:
+            return None     # damaged pages
+        # end if
+        _tables[_name] = _data.cast(_typecode)
+    # end for
+    return _tables
+# end def
+
+
+def write_tables(path, tables, key=""):
+    """
+        writes {name: array.array} @tables to @path atomically, so
+        that concurrent readers only ever see whole files;
+    """
+    _key = _full_key(key)
+    _header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(_key), len(tables)
+    ) + _key
+    _offset = HEADER_SIZE
+    _layout = []
+    for _name, _array in sorted(tables.items()):
+        _header += _ENTRY.pack(
+            _name.encode(), _array.typecode.encode(),
+            zlib.crc32(_array), _offset, len(_array),
+        )
+        _layout.append((_offset, _array))
+        _offset += -(-len(_array) * _array.itemsize // ALIGNMENT) * ALIGNMENT
+    # end for
+    if len(_header) > HEADER_SIZE:
+        raise ValueError("too many tables or key too long for header")
+    # end if
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    _temporary = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(_temporary, "wb") as _file:
+            _file.write(_header.ljust(HEADER_SIZE, b"\0"))
+            for _offset, _array in _layout:
+                _file.seek(_offset)
+                _array.tofile(_file)
+            # end for
+        # end with
+        os.replace(_temporary, path)
+    finally:
+        if os.path.exists(_temporary):
+            os.remove(_temporary)
+        # end if
+    # end try
+# end def
+
+
+def load(name, build, key="", force=False, depends=()):
+    """
+        returns the tables of set @name as {name: sequence}: mapped
+        from the cache file if it is up to date, else built with
+        @build() (-> {name: array.array}) and saved first;
+
+        up to date means built from the same @key, by the same code
+        of @build and of the functions it @depends on;
+
+        if the cache can not be written, built arrays are returned
+        as they are;
+    """
+    _path = os.path.join(cache_dir(), name + ".tbl")
+    key = "{}:{}".format(code_version(build, *depends), key)
+    _tables = None if force else map_tables(_path, key)
+    if _tables is None:
+        _arrays = build()
+        try:
+            write_tables(_path, _arrays, key)
+        except OSError:
+            return _arrays
+        # end try
+        _tables = map_tables(_path, key)
+        if _tables is None:
+            return _arrays
+        # end if
+    # end if
+    return _tables
+# end def
+
+
+def prune(prefix, keep=()):
+    """
+        removes the cache files of table sets named @prefix...,
+        except those in @keep: for sets keyed by user settings, which
+        would otherwise pile up, one file per setting ever tried;
+    """
+    _dir = cache_dir()
+    try:
+        _files = os.listdir(_dir)
+    except OSError:
+        return
+    # end try
+    _keep = set(_name + ".tbl" for _name in keep)
+    for _file in _files:
+        if (_file.startswith(prefix) and _file.endswith(".tbl") and
+                _file not in _keep):
+            try:
+                os.remove(os.path.join(_dir, _file))
+            except OSError:
+                pass    # e.g. still mapped on Windows, next time
+            # end try
+        # end if
+    # end for
+# end def
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import queue
+import threading
+
+
+class Game2048Worker:
+    """
+        runs @player searches in a background thread, so that the Tk
+        main loop never waits for the AI;
+
+        submit() queues a bitboard and returns a token, get_result()
+        gives back (token, bitboard, direction) tuples; cancel() drops
+        every pending search and aborts the running one;
+
+        a search that raises gives back the exception in place of
+        the direction, and the thread goes on with the next request;
+    """
+
+    def __init__(self, player):
+        self.player = player
+        self.__requests = queue.Queue()
+        self.__results = queue.Queue()
+        self.__generation = 0
+        self.__token = 0
+        self.__thread = None
+    # end def
+
+    def _is_stale(self, generation):
+        return generation != self.__generation
+    # end def
+
+    def cancel(self):
+        self.__generation += 1
+        while True:
+            try:
+                self.__results.get_nowait()
+            except queue.Empty:
+                break
+            # end try
+        # end while
+    # end def
+
+    def close(self):
+        self.cancel()
+        if self.__thread:
+            self.__requests.put(None)
+            self.__thread = None
+        # end if
+    # end def
+
+    def get_result(self, timeout=0):
+        try:
+            if timeout and timeout > 0:
+                return self.__results.get(timeout=timeout)
+            # end if
+            return self.__results.get_nowait()
+        except queue.Empty:
+            return None
+        # end try
+    # end def
+
+    def run(self):
+        try:
+            while True:
+                _request = self.__requests.get()
+                if _request is None:
+                    break
+                # end if
+                _generation, _token, _board = _request
+                if self._is_stale(_generation):
+                    continue
+                # end if
+                try:
+                    _direction = self.player.get_move(
+                        _board, abort=lambda: self._is_stale(_generation)
+                    )
+                except Exception as _error:
+                    _direction = _error
+                # end try
+                if not self._is_stale(_generation):
+                    self.__results.put((_token, _board, _direction))
+                # end if
+            # end while
+        finally:
+            # a dead thread is started again by the next submit()
+            if self.__thread is threading.current_thread():
+                self.__thread = None
+            # end if
+        # end try
+    # end def
+
+    def submit(self, board):
+        if not self.__thread:
+            self.__thread = threading.Thread(target=self.run, daemon=True)
+            self.__thread.start()
+        # end if
+        self.__token += 1
+        self.__requests.put((self.__generation, self.__token, board))
+        return self.__token
+    # end def
+
+# end class
@@ -24,6 +24,8 @@
     If not, see http://www.gnu.org/licenses/
 """
 
+import time
+
 try:
     import Tkinter as tk
 except:
@@ -63,6 +65,8 @@ class GameGrid (tk.Canvas):
         self.__tiles = dict()
         self.__matrix = GridMatrix(self.rows, self.columns)
         self.__cell_size = GridCellSize(self)
+        self.__item_pool = GridItemPool(self, self.max_tiles)
+        self.__animator = GridAnimator(self)
         self.init_widget(**self.CONFIG)
     # end def
 
@@ -77,6 +81,11 @@ class GameGrid (tk.Canvas):
         return _dict
     # end def
 
+    @property
+    def animator(self):
+        return self.__animator
+    # end def
+
     @property
     def cell_size(self):
         return self.__cell_size
@@ -89,7 +98,9 @@ class GameGrid (tk.Canvas):
     # end def
 
     def clear_grid(self, tk_event=None, *args, **kw):
+        self.animator.cancel_all()
         self.delete(tk.ALL)
+        self.item_pool.reset_pool()
     # end def
 
     def clear_tiles(self, tk_event=None, *args, **kw):
@@ -156,6 +167,11 @@ class GameGrid (tk.Canvas):
         return len(self.tiles) >= self.max_tiles
     # end def
 
+    @property
+    def item_pool(self):
+        return self.__item_pool
+    # end def
+
     def is_tile(self, row, column):
         _x, _y = self.get_coords(row, column, centered=True)
         _item_id = self.find_overlapping(_x, _y, _x, _y)
@@ -267,90 +283,103 @@ class GameGrid (tk.Canvas):
 # end class
 
 
-class GridAnimation (tk.Frame):
+class GridAnimator:
+    """
+        one scheduler for every running animation of a grid: a single
+        after() chain advances all of them by one step per tick, no
+        widget is allocated per animation;
+
+        callbacks are called as callback(value=step_value, **kw);
+    """
+
+    TICK = 16   # ms
 
-    def __init__(self, master=None):
-        tk.Frame.__init__(self, master)
-        self.owner = master
-        self.__pid = 0
-        self.__animation_kw = dict()
-        self.__callback = None
-        self.__callback_args = tuple()
-        self.__callback_kw = dict()
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.__animations = dict()
+        self.__last_id = 0
+        self.__pid = None
     # end def
 
-    @property
-    def keywords(self):
-        return self.__animation_kw
+    def __len__(self):
+        return len(self.__animations)
     # end def
 
-    def register(self, callback, *args, **kw):
-        if callable(callback):
-            self.__callback = callback
-            self.__callback_args = args
-            self.__callback_kw = kw
-            return True
-        else:
+    def _now(self):
+        return time.perf_counter() * 1000.0
+    # end def
+
+    def _step(self, animation):
+        _callback, _kw, _sequence = animation[2:5]
+        _kw = dict(_kw, value=_sequence[animation[1]])
+        animation[1] += 1
+        _callback(**_kw)
+        return animation[1] < len(_sequence)
+    # end def
+
+    def add(self, callback, sequence, interval=100, delay=0, **kw):
+        if not callable(callback):
             raise TypeError(
                 "callback object *MUST* be a callable one."
             )
-        # end if - callable
-        return False
+        # end if
+        if not sequence:
+            return None
+        # end if
+        self.__last_id += 1
+        # [due time, step, callback, kw, sequence, interval]
+        self.__animations[self.__last_id] = [
+            self._now() + delay, 0, callback, kw, tuple(sequence), interval,
+        ]
+        if not self.__pid:
+            self.__pid = self.canvas.after(min(delay, self.TICK), self.tick)
+        # end if
+        return self.__last_id
     # end def
 
-    def resume(self):
-        return self.run_sequencer()
-    # end def
-
-    def run_sequencer(self, animation_kw=None):
-        self.stop()
-        if callable(self.__callback):
-            if isinstance(animation_kw, dict):
-                self.__animation_kw = _anim_kw = animation_kw
-            else:
-                _anim_kw = self.__animation_kw
-            # end if - animation_kw
-            _sequence = _anim_kw.get("sequence")
-            if isinstance(_sequence, (list, tuple)):
-                _interval = int(_anim_kw.get("interval", 100))
-                _step = int(_anim_kw.get("step", 0))
-                if _step < len(_sequence):
-                    self.__callback_kw.update(
-                        value=_sequence[_step]
-                    )
-                    self.__callback(
-                        *self.__callback_args, **self.__callback_kw
-                    )
-                    self.__animation_kw["step"] = _step + 1
-                    self.__pid = self.after(
-                        _interval, self.run_sequencer
-                    )
-                # end if - new step
-            # end if - sequence
-        # end if - callable
-        return self.__pid
-    # end def
-
-    def start(self, interval=100, step=0, sequence=None):
-        return self.run_sequencer(
-            dict(interval=interval, step=step, sequence=sequence)
-        )
+    def cancel(self, animation_id):
+        self.__animations.pop(animation_id, None)
     # end def
 
-    def start_after(self, delay=500, interval=100, step=0, sequence=None):
-        self.__pid = self.after(
-            delay, self.start, interval, step, sequence
-        )
-        return self.__pid
+    def cancel_all(self):
+        self.__animations.clear()
+        if self.__pid:
+            self.canvas.after_cancel(self.__pid)
+            self.__pid = None
+        # end if
     # end def
 
-    def stop(self, pid=None):
-        if pid:
-            self.after_cancel(pid)
+    def skip(self, animation_id=None):
+        # runs remaining steps at once, e.g. when moves come faster
+        # than frames; all animations if @animation_id is None
+        if animation_id is None:
+            _ids = list(self.__animations)
         else:
-            self.after_cancel(self.__pid)
-            self.__pid = 0
-        # end if - pid
+            _ids = [animation_id]
+        # end if
+        for _id in _ids:
+            _animation = self.__animations.pop(_id, None)
+            while _animation and self._step(_animation):
+                pass
+            # end while
+        # end for
+    # end def
+
+    def tick(self, tk_event=None, *args, **kw):
+        self.__pid = None
+        _now = self._now()
+        for _id, _animation in list(self.__animations.items()):
+            if _id in self.__animations and _animation[0] <= _now:
+                if self._step(_animation):
+                    _animation[0] += _animation[5]
+                else:
+                    self.__animations.pop(_id, None)
+                # end if
+            # end if
+        # end for
+        if self.__animations and not self.__pid:
+            self.__pid = self.canvas.after(self.TICK, self.tick)
+        # end if
     # end def
 
 # end class
@@ -451,6 +480,66 @@ class GridError (Exception):
 # end class
 
 
+class GridItemPool:
+    """
+        @size reusable (rectangle, text) canvas item pairs: tiles get
+        recoloured and moved instead of created and deleted, so that
+        canvas item count stays flat however long the game runs;
+
+        both items of a pair share the tag pair_tag(rectangle id), so
+        that one canvas call moves, shows or hides a whole tile;
+    """
+
+    def __init__(self, canvas, size):
+        self.canvas = canvas
+        self.size = size
+        self.reset_pool()
+    # end def
+
+    def acquire(self):
+        if not self.__created:
+            self.create_items()
+        # end if
+        if not self.__free:
+            raise GridError("no more free tile items in pool")
+        # end if
+        return self.__free.pop()
+    # end def
+
+    def create_items(self):
+        for _n in range(self.size):
+            _rect_id = self.canvas.create_rectangle(
+                0, 0, 0, 0, width=0, state=tk.HIDDEN, tags="tiles",
+            )
+            _text_id = self.canvas.create_text(
+                0, 0, state=tk.HIDDEN,
+                tags=("values", self.pair_tag(_rect_id)),
+            )
+            self.canvas.addtag_withtag(self.pair_tag(_rect_id), _rect_id)
+            self.__free.append((_rect_id, _text_id))
+        # end for
+        self.__created = True
+    # end def
+
+    @staticmethod
+    def pair_tag(rect_id):
+        return "pair{}".format(rect_id)
+    # end def
+
+    def release(self, items):
+        self.canvas.itemconfigure(self.pair_tag(items[0]), state=tk.HIDDEN)
+        self.__free.append(items)
+    # end def
+
+    def reset_pool(self):
+        # forget items, e.g. after canvas.delete(ALL)
+        self.__free = list()
+        self.__created = False
+    # end def
+
+# end class
+
+
 class GridMatrix:
 
     def __init__(self, rows, columns):
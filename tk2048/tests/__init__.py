@@ -0,0 +1,10 @@
+
+import atexit
+import os
+import shutil
+import tempfile
+
+# engines build their lookup tables on import: keep them, and those
+# the tests write, out of the user's table cache
+os.environ["TK2048_TABLES"] = tempfile.mkdtemp(prefix="tk2048-tables-")
+atexit.register(shutil.rmtree, os.environ["TK2048_TABLES"], True)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import heapq
+import time
+import unittest
+
+from tk2048.src import game2048_ai as GA
+from tk2048.src import game2048_autoplay as GP
+from tk2048.src import game2048_board as GB
+from tk2048.src import game2048_random as GR
+from tk2048.src import game2048_worker as GW
+
+
+class FakeGrid:
+    """
+        headless stand-in for Game2048Grid: after() callbacks run
+        from run(), in due time order, at real time;
+    """
+
+    def __init__(self, seed):
+        self.board = GB.Game2048Board(rng=GR.Game2048Random(seed))
+        self.renders = 0
+        self.__queue = []
+        self.__pid = 0
+        self.__cancelled = set()
+    # end def
+
+    def after(self, ms, callback):
+        self.__pid += 1
+        heapq.heappush(
+            self.__queue,
+            (time.perf_counter() + ms / 1000.0, self.__pid, callback),
+        )
+        return self.__pid
+    # end def
+
+    def after_cancel(self, pid):
+        self.__cancelled.add(pid)
+    # end def
+
+    def render_board(self):
+        self.renders += 1
+    # end def
+
+    def run(self, timeout=60.0):
+        _stop = time.perf_counter() + timeout
+        while self.__queue and time.perf_counter() < _stop:
+            _due, _pid, _callback = heapq.heappop(self.__queue)
+            if _pid in self.__cancelled:
+                continue
+            # end if
+            time.sleep(max(0.0, _due - time.perf_counter()))
+            _callback()
+        # end while
+    # end def
+
+# end class
+
+
+class FailingPlayer:
+
+    def __init__(self, failures):
+        self.failures = failures
+    # end def
+
+    def get_move(self, board, abort=None):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("search failed")
+        # end if
+        return "left"
+    # end def
+
+# end class
+
+
+class AutoplayTest (unittest.TestCase):
+
+    def play(self, seed, moves_per_second):
+        _grid = FakeGrid(seed)
+        _history = []
+        _board = _grid.board
+        _move = _board.move
+
+        def _record(direction, **kw):
+            _history.append((_board.bitboard, direction))
+            return _move(direction, **kw)
+        # end def
+
+        _board.move = _record
+        _autoplay = GP.Game2048Autoplay(
+            _grid, GA.Game2048Expectimax(depth=1, time_budget=None),
+            moves_per_second=moves_per_second,
+        )
+        _autoplay.start(start_tiles=2)
+        _grid.run()
+        _autoplay.close()
+        self.assertTrue(_board.no_more_hints())
+        return (_history, _board.bitboard, _board.score)
+    # end def
+
+    def test_seeded_game_same_at_any_speed(self):
+        _fast = self.play(2048, None)
+        _paced = self.play(2048, 2000)
+        self.assertEqual(_fast, _paced)
+    # end def
+
+    def test_start_tiles_before_first_search(self):
+        _history = self.play(7, None)[0]
+        _first = _history[0][0]
+        _tiles = sum(
+            1 for _shift in range(0, 64, 4) if (_first >> _shift) & 0xF
+        )
+        self.assertEqual(_tiles, 2)
+    # end def
+
+    def test_search_error_stops_autoplay(self):
+        _grid = FakeGrid(3)
+        _autoplay = GP.Game2048Autoplay(_grid, FailingPlayer(1))
+        with self.assertLogs("tk2048", "ERROR") as _logs:
+            _autoplay.start(start_tiles=2)
+            _grid.run(timeout=10.0)
+        # end with
+        _autoplay.close()
+        self.assertFalse(_autoplay.running)
+        self.assertEqual(_autoplay.moves, 0)
+        self.assertIn("RuntimeError", "\n".join(_logs.output))
+    # end def
+
+    def test_worker_survives_search_error(self):
+        _worker = GW.Game2048Worker(FailingPlayer(1))
+        _results = []
+        for _board in (1, 2):
+            _token = _worker.submit(_board)
+            _results.append(_worker.get_result(timeout=5.0))
+        # end for
+        _worker.close()
+        self.assertIsInstance(_results[0][2], RuntimeError)
+        self.assertEqual(_results[1], (_token, 2, "left"))
+    # end def
+
+# end class
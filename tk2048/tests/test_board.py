@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import unittest
+
+from tk2048.src import game2048_ai as GA
+from tk2048.src import game2048_autoplay as GP
+from tk2048.src import game2048_bitboard as BB
+from tk2048.src import game2048_board as GB
+from tk2048.tests.test_autoplay import FakeGrid
+
+
+# full board: 65536 next to 32768 (equal capped ranks), the only
+# real merge is the 2 over 2 in column 0
+SATURATED = (
+    (65536, 32768, 2, 4),
+    (2, 4, 8, 16),
+    (2, 8, 16, 32),
+    (4, 16, 32, 64),
+)
+
+
+class SaturatedBoardTest (unittest.TestCase):
+
+    def test_merge_above_bitboard_limit(self):
+        _board = GB.Game2048Board()
+        _board.set_value(0, 0, 32768)
+        _board.set_value(0, 1, 32768)
+        self.assertFalse(_board.saturated)
+        self.assertTrue(_board.move("left"))
+        self.assertEqual(_board.cells[0][:2], [65536, 0])
+        self.assertEqual(_board.bitboard & 0xF, BB.MAX_RANK)
+        self.assertTrue(_board.saturated)
+    # end def
+
+    def test_legal_moves_trust_cells(self):
+        _board = GB.Game2048Board()
+        _board.set_cells(SATURATED)
+        self.assertTrue(_board.saturated)
+        self.assertEqual(
+            _board.legal_moves(),
+            BB.DIRECTION_BITS["down"] | BB.DIRECTION_BITS["up"],
+        )
+        self.assertFalse(_board.no_more_hints())
+        self.assertFalse(_board.move("left"))
+        _cells = [list(_line) for _line in SATURATED]
+        _cells[2][0] = 128
+        _board.set_cells(_cells)
+        self.assertEqual(_board.legal_moves(), 0)
+        self.assertTrue(_board.no_more_hints())
+    # end def
+
+    def test_autoplay_ends_saturated_game(self):
+        _grid = FakeGrid(1)
+        _grid.board.set_cells(SATURATED)
+        _autoplay = GP.Game2048Autoplay(
+            _grid, GA.Game2048Expectimax(depth=1, time_budget=None)
+        )
+        _autoplay.start()
+        _grid.run(timeout=20.0)
+        _autoplay.close()
+        self.assertFalse(_autoplay.running)
+        self.assertTrue(_grid.board.no_more_hints())
+        self.assertGreater(_autoplay.moves, 0)
+    # end def
+
+# end class
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import unittest
+
+from tk2048.src import game2048_batch as GBT
+from tk2048.src import game2048_bitboard as BB
+from tk2048.src import game2048_board as GB
+from tk2048.src import game2048_random as GR
+
+
+def reference_line(values):
+    # old move_tiles_*() rules on one line, listed from the edge
+    # tiles are pushed to: each tile fuses once with the next one
+    _tiles = [_value for _value in values if _value]
+    _line = []
+    _gain = 0
+    _i = 0
+    while _i < len(_tiles):
+        if _i + 1 < len(_tiles) and _tiles[_i] == _tiles[_i + 1]:
+            _line.append(2 * _tiles[_i])
+            _gain += 2 * _tiles[_i]
+            _i += 2
+        else:
+            _line.append(_tiles[_i])
+            _i += 1
+        # end if
+    # end while
+    return (_line + [0] * (len(values) - len(_line)), _gain)
+# end def
+
+
+def reference_move(cells, direction):
+    # (cells, gain) after a move, on plain lists
+    _cells = [list(_line) for _line in cells]
+    _gain = 0
+    for _k in range(4):
+        _lines = dict(
+            left=[(_k, _j) for _j in range(4)],
+            right=[(_k, 3 - _j) for _j in range(4)],
+            up=[(_j, _k) for _j in range(4)],
+            down=[(3 - _j, _k) for _j in range(4)],
+        )[direction]
+        _values, _gained = reference_line(
+            [_cells[_row][_column] for _row, _column in _lines]
+        )
+        for (_row, _column), _value in zip(_lines, _values):
+            _cells[_row][_column] = _value
+        # end for
+        _gain += _gained
+    # end for
+    return (_cells, _gain)
+# end def
+
+
+def random_cells(rng):
+    # mostly small ranks and many holes, like real games
+    return [
+        [
+            (1 << _rank) if _rank else 0
+            for _rank in (
+                max(0, rng.randrange(-5, 12)) for _column in range(4)
+            )
+        ]
+        for _row in range(4)
+    ]
+# end def
+
+
+class EngineRulesTest (unittest.TestCase):
+
+    BOARDS = 3000
+
+    def setUp(self):
+        _rng = GR.Game2048Random(2048)
+        self.cells = [random_cells(_rng) for _n in range(self.BOARDS)]
+    # end def
+
+    def test_board_and_bitboard_match_reference(self):
+        for _cells in self.cells:
+            _legal = 0
+            for _direction in GB.DIRECTIONS:
+                _expected, _gain = reference_move(_cells, _direction)
+                _acted = _expected != _cells
+                if _acted:
+                    _legal |= BB.DIRECTION_BITS[_direction]
+                # end if
+                _board = GB.Game2048Board()
+                _board.set_cells(_cells)
+                self.assertEqual(_board.move(_direction), _acted)
+                self.assertEqual(_board.cells, _expected)
+                self.assertEqual(_board.score, _gain)
+                # incremental state equals a rebuild from cells
+                _fresh = GB.Game2048Board()
+                _fresh.set_cells(_expected)
+                self.assertEqual(_board.bitboard, _fresh.bitboard)
+                self.assertEqual(_board.bitboard, BB.encode(_expected))
+                self.assertEqual(_board.empty_mask, _fresh.empty_mask)
+                self.assertEqual(_board.empty_count, _fresh.empty_count)
+                self.assertEqual(
+                    BB.move(BB.encode(_cells), _direction),
+                    (BB.encode(_expected), _gain),
+                )
+            # end for
+            _board = GB.Game2048Board()
+            _board.set_cells(_cells)
+            self.assertEqual(_board.legal_moves(), _legal)
+            self.assertEqual(BB.legal_moves(BB.encode(_cells)), _legal)
+            self.assertEqual(_board.no_more_hints(), not _legal)
+        # end for
+    # end def
+
+    @unittest.skipIf(GBT.np is None, "numpy is not installed")
+    def test_batch_matches_reference(self):
+        _bitboards = [BB.encode(_cells) for _cells in self.cells]
+        _boards = GBT.decode_bitboards(_bitboards)
+        for _direction in GB.DIRECTIONS:
+            _moved, _gains = GBT.move_boards(_boards, _direction)
+            _expected = [
+                reference_move(_cells, _direction) for _cells in self.cells
+            ]
+            self.assertTrue((
+                _moved == GBT.decode_bitboards(
+                    [BB.encode(_result[0]) for _result in _expected]
+                )
+            ).all())
+            self.assertEqual(
+                list(_gains), [_result[1] for _result in _expected]
+            )
+        # end for
+        self.assertEqual(
+            list(GBT.has_moves(_boards)),
+            [bool(BB.legal_moves(_bitboard)) for _bitboard in _bitboards],
+        )
+    # end def
+
+# end class
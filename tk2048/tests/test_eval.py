@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import os
+import unittest
+
+from tk2048.src import game2048_eval as GE
+from tk2048.src import game2048_tables as GT
+
+
+def bitboard(ranks):
+    # {(row, column): rank} -> bitboard int
+    _board = 0
+    for (_row, _column), _rank in ranks.items():
+        _board |= _rank << (4 * (4 * _row + _column))
+    # end for
+    return _board
+# end def
+
+
+class CornerWeightTest (unittest.TestCase):
+
+    CORNER = 50.0
+
+    def test_bonus_only_for_edge_line_ends(self):
+        _weights = dict(GE.WEIGHTS, corner=self.CORNER)
+        for _row, _bonus in ((0x0128, 8), (0x8210, 8), (0x1821, 0)):
+            self.assertEqual(
+                GE.row_score(_row, _weights, edge=True) -
+                GE.row_score(_row, GE.WEIGHTS, edge=True),
+                self.CORNER * _bonus,
+            )
+            self.assertEqual(
+                GE.row_score(_row, _weights),
+                GE.row_score(_row, GE.WEIGHTS),
+            )
+        # end for
+    # end def
+
+    def test_corner_max_outscores_middle_max(self):
+        _corner = bitboard({(0, 0): 8, (1, 1): 1, (2, 3): 2})
+        _middle = bitboard({(0, 0): 1, (1, 1): 8, (2, 3): 2})
+        _plain = GE.Game2048Evaluator()
+        _evaluator = GE.Game2048Evaluator(corner=self.CORNER)
+        self.assertGreater(
+            _evaluator.evaluate(_corner), _evaluator.evaluate(_middle)
+        )
+        # the bonus counts once for the corner row, once for its column
+        self.assertEqual(
+            _evaluator.evaluate(_corner) - _plain.evaluate(_corner),
+            2 * self.CORNER * 8,
+        )
+    # end def
+
+# end class
+
+
+class TableCacheTest (unittest.TestCase):
+
+    def test_only_last_custom_weights_stay_cached(self):
+        GE.load_tables(GE.WEIGHTS)
+        for _empty in (250.0, 260.0):
+            _weights = dict(GE.WEIGHTS, empty=_empty)
+            GE.load_tables(_weights)
+        # end for
+        _files = set(
+            _name for _name in os.listdir(GT.cache_dir())
+            if _name.startswith("heuristic-")
+        )
+        self.assertEqual(_files, {
+            GE.table_name(GE.WEIGHTS) + ".tbl",
+            GE.table_name(_weights) + ".tbl",
+        })
+    # end def
+
+# end class
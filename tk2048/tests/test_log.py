@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import io
+import unittest
+
+from tk2048.src import game2048_log as GL
+
+
+class ConfigureTest (unittest.TestCase):
+
+    def setUp(self):
+        self.handlers = list(GL.logger.handlers)
+        self.level = GL.logger.level
+    # end def
+
+    def tearDown(self):
+        GL.logger.handlers[:] = self.handlers
+        GL.logger.setLevel(self.level)
+        GL._handler = None
+    # end def
+
+    def test_configure_twice_logs_once(self):
+        _first, _second = io.StringIO(), io.StringIO()
+        GL.configure("info", _first, fmt="%(message)s")
+        GL.configure("info", _second, fmt="%(message)s")
+        GL.logger.info("hello")
+        self.assertEqual(_first.getvalue(), "")
+        self.assertEqual(_second.getvalue(), "hello\n")
+        self.assertEqual(
+            len(GL.logger.handlers), len(self.handlers) + 1
+        )
+    # end def
+
+    def test_no_level_keeps_handlers(self):
+        GL.configure(None)
+        self.assertEqual(GL.logger.handlers, self.handlers)
+        self.assertEqual(GL.logger.level, self.level)
+    # end def
+
+# end class
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import unittest
+
+from tk2048.src import game2048_ai as GA
+from tk2048.src import game2048_bitboard as BB
+from tk2048.src import game2048_board as GB
+from tk2048.src import game2048_ntuple as GN
+from tk2048.src import game2048_random as GR
+
+
+class NTupleSearchTest (unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # small network, trained a little: weights are not all zero
+        cls.network = GN.Game2048NTuple(GN.TUPLES_4)
+        cls.trainer = GN.Game2048TDTrainer(cls.network, seed=23)
+        for _game in range(20):
+            cls.trainer.play_game()
+        # end for
+    # end def
+
+    def boards(self, seed, count):
+        # positions of a seeded random game, restarted when lost
+        _rng = GR.Game2048Random(seed)
+        _board = GB.Game2048Board(rng=_rng.fork())
+        _boards = []
+        while len(_boards) < count:
+            if _board.no_more_hints() or _board.empty_count == 16:
+                _board.reset_board()
+                _board.pop_tile()
+                _board.pop_tile()
+            # end if
+            if _board.move(_rng.choice(GB.DIRECTIONS)):
+                _board.pop_tile()
+                _boards.append(_board.bitboard)
+            # end if
+        # end while
+        return _boards
+    # end def
+
+    def test_depth_1_search_is_greedy_td_policy(self):
+        _player = GA.Game2048Expectimax(
+            depth=1, time_budget=None,
+            evaluator=self.network.evaluate, afterstates=True,
+        )
+        for _board in self.boards(5, 300):
+            _greedy = self.trainer.best_afterstate(_board)
+            self.assertEqual(
+                _player.get_move(_board), _greedy and _greedy[0]
+            )
+        # end for
+    # end def
+
+    def test_deeper_search_adds_move_gains(self):
+        # two plies: gain + mean over spawns of the best next
+        # gain + V(afterstate), checked against a plain recursion
+        _network = self.network
+        _player = GA.Game2048Expectimax(
+            depth=2, time_budget=None, cache_entries=0,
+            evaluator=_network.evaluate, afterstates=True,
+        )
+
+        def _greedy_value(board):
+            _best = self.trainer.best_afterstate(board)
+            if _best is None:
+                return 0.0
+            # end if
+            return _best[1] + _network.evaluate(_best[2])
+        # end def
+
+        for _board in self.boards(9, 20):
+            _expected = None
+            for _direction in GB.DIRECTIONS:
+                _after, _gain = BB.move(_board, _direction)
+                if _after == _board:
+                    continue
+                # end if
+                _shifts = GA.empty_shifts(_after)
+                _total = 0.0
+                for _shift in _shifts:
+                    for _rank, _odds in GA.SPAWN_ODDS:
+                        _total += _odds * _greedy_value(
+                            _after | (_rank << _shift)
+                        )
+                    # end for
+                # end for
+                _value = _total / len(_shifts) + _gain
+                if _expected is None or _value > _expected:
+                    _expected = _value
+                # end if
+            # end for
+            self.assertAlmostEqual(
+                _player.search_node(_board, 2), _expected, places=6
+            )
+        # end for
+    # end def
+
+# end class
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from tk2048.src import game2048_bitboard as BB
+from tk2048.src import game2048_board as GB
+from tk2048.src import game2048_random as GR
+from tk2048.src import game2048_replay as GRP
+
+
+def play_game(recorder, seed):
+    # first acting direction in a fixed order, until game over
+    _board = GB.Game2048Board(rng=GR.Game2048Random(seed))
+    _board.recorder = recorder
+    recorder.begin_game(_board)
+    _board.pop_tile()
+    _board.pop_tile()
+    while not _board.no_more_hints():
+        _mask = _board.legal_moves()
+        for _direction in ("left", "down", "right", "up"):
+            if _mask & BB.DIRECTION_BITS[_direction]:
+                _board.move(_direction)
+                _board.pop_tile()
+                break
+            # end if
+        # end for
+    # end while
+    _moves = recorder.moves
+    recorder.end_game()
+    return (_board.bitboard, _board.score, _moves)
+# end def
+
+
+class ReplayFileTest (unittest.TestCase):
+
+    SEEDS = (3, 7)
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "games.rpl")
+        with open(self.path, "wb") as _file:
+            _recorder = GRP.Game2048Recorder(_file, snapshot_interval=16)
+            self.results = [
+                play_game(_recorder, _seed) for _seed in self.SEEDS
+            ]
+        # end with
+    # end def
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+    # end def
+
+    def test_round_trip(self):
+        _games = list(GRP.iter_games(self.path, chunk_size=100))
+        self.assertEqual([_seed for _seed, _events in _games],
+                         list(self.SEEDS))
+        for (_seed, _events), _result in zip(_games, self.results):
+            _kinds = [_event[0] for _event in _events]
+            self.assertIn("snapshot", _kinds)
+            self.assertEqual(_kinds[-1], "end")
+            _bitboard, _score, _moves = _result
+            self.assertEqual(_events[-1][1:], (_moves, _score, _bitboard))
+            self.assertEqual(GRP.replay_game(_events), _result)
+        # end for
+    # end def
+
+    def test_truncated_file_raises(self):
+        # cut in the middle of the final snapshot
+        with open(self.path, "r+b") as _file:
+            _file.truncate(os.path.getsize(self.path) - 5)
+        # end with
+        with self.assertRaisesRegex(GRP.ReplayError, "truncated"):
+            list(GRP.iter_games(self.path))
+        # end with
+    # end def
+
+    def test_corrupted_snapshot_raises(self):
+        # last bytes are the final snapshot: bitboard, then checksum
+        with open(self.path, "r+b") as _file:
+            _file.seek(-GRP.CHECKSUM.size - 1, os.SEEK_END)
+            _byte = _file.read(1)
+            _file.seek(-GRP.CHECKSUM.size - 1, os.SEEK_END)
+            _file.write(bytes([_byte[0] ^ 0xFF]))
+        # end with
+        with self.assertRaisesRegex(GRP.ReplayError, "checksum"):
+            list(GRP.iter_games(self.path))
+        # end with
+    # end def
+
+    def test_diverging_replay_raises(self):
+        _seed, _events = next(GRP.iter_games(self.path))
+        # a 2 turned into a 4 (or back) past the start tiles
+        _index = next(
+            _i for _i, _event in enumerate(_events)
+            if _i > 2 and _event[0] == "spawn"
+        )
+        _kind, _row, _column, _value = _events[_index]
+        _events[_index] = (_kind, _row, _column, 6 - _value)
+        with self.assertRaisesRegex(GRP.ReplayError, "diverged"):
+            GRP.replay_game(_events)
+        # end with
+    # end def
+
+# end class
+
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+import array
+import os
+import shutil
+import tempfile
+import unittest
+
+from tk2048.src import game2048_tables as GT
+
+
+class TableFileTest (unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "test.tbl")
+        self.tables = dict(
+            scores=array.array("d", (0.5 * _n for _n in range(5000))),
+            rows=array.array("H", range(65536)),
+        )
+        GT.write_tables(self.path, self.tables, key="k")
+    # end def
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+    # end def
+
+    def test_round_trip(self):
+        _tables = GT.map_tables(self.path, key="k")
+        for _name, _array in self.tables.items():
+            self.assertEqual(list(_tables[_name]), list(_array))
+        # end for
+    # end def
+
+    def test_other_key_is_rejected(self):
+        self.assertIsNone(GT.map_tables(self.path, key="other"))
+    # end def
+
+    def test_truncated_file_is_rejected(self):
+        with open(self.path, "r+b") as _file:
+            _file.truncate(os.path.getsize(self.path) - 100)
+        # end with
+        self.assertIsNone(GT.map_tables(self.path, key="k"))
+    # end def
+
+    def test_damaged_page_is_rejected(self):
+        with open(self.path, "r+b") as _file:
+            _file.seek(GT.HEADER_SIZE + 1000)
+            _byte = _file.read(1)
+            _file.seek(GT.HEADER_SIZE + 1000)
+            _file.write(bytes([_byte[0] ^ 0xFF]))
+        # end with
+        self.assertIsNone(GT.map_tables(self.path, key="k"))
+    # end def
+
+    def build(self):
+        self.builds += 1
+        return self.tables
+    # end def
+
+    def in_cache_dir(self, test):
+        # runs @test with self.dir as table cache
+        os.environ["TK2048_TABLES"], _saved = (
+            self.dir, os.environ.get("TK2048_TABLES")
+        )
+        try:
+            test()
+        finally:
+            if _saved is None:
+                del os.environ["TK2048_TABLES"]
+            else:
+                os.environ["TK2048_TABLES"] = _saved
+            # end if
+        # end try
+    # end def
+
+    def test_load_rebuilds_damaged_file(self):
+        def _test():
+            self.builds = 0
+            GT.load("test", self.build, key="k")
+            with open(self.path, "r+b") as _file:
+                _file.truncate(GT.HEADER_SIZE + 10)
+            # end with
+            _tables = GT.load("test", self.build, key="k")
+            self.assertEqual(list(_tables["rows"]), list(range(65536)))
+            GT.load("test", self.build, key="k")
+            self.assertEqual(self.builds, 2)
+        # end def
+        self.in_cache_dir(_test)
+    # end def
+
+    def test_load_rebuilds_after_builder_change(self):
+        def _other():
+            return self.tables
+        # end def
+        def _test():
+            self.builds = 0
+            GT.load("test", self.build, key="k")
+            GT.load("test", self.build, key="k", depends=(_other,))
+            GT.load("test", self.build, key="k", depends=(_other,))
+            self.assertEqual(self.builds, 2)
+            self.assertNotEqual(
+                GT.code_version(self.build),
+                GT.code_version(self.build, _other),
+            )
+        # end def
+        self.in_cache_dir(_test)
+    # end def
+
+    def test_prune_keeps_listed_sets(self):
+        def _test():
+            for _name in ("set-a", "set-b", "set-c"):
+                GT.write_tables(
+                    os.path.join(self.dir, _name + ".tbl"), self.tables
+                )
+            # end for
+            GT.prune("set-", keep=("set-b",))
+            self.assertEqual(
+                sorted(os.listdir(self.dir)), ["set-b.tbl", "test.tbl"]
+            )
+        # end def
+        self.in_cache_dir(_test)
+    # end def
+
+# end class
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+    Gabriele Cirulli's 2048 puzzle game.
+
+    Python3/tkinter port by Raphaël Seban <motus@laposte.net>
+
+    Copyright (c) 2014+ Raphaël Seban for the present code.
+
+    This program is free software: you can redistribute it and/or
+    modify it under the terms of the GNU General Public License as
+    published by the Free Software Foundation, either version 3 of
+    the License, or (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+    General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.
+
+    If not, see http://www.gnu.org/licenses/
+"""
+
+# headless TD self-play training of the n-tuple network:
+#
+#   python -m tk2048.train --games 100000 --weights ntuple.bin
+#
+# the weights file is created if missing and memory-mapped, so a
+# run can be stopped and resumed at any time
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from . import LAUNCH_DIR
+from .src import game2048_ntuple as GN
+
+
+def parse_args(argv=None):
+    _parser = argparse.ArgumentParser(
+        prog="python -m tk2048.train",
+        description="Train the 2048 n-tuple network by TD self-play.",
+    )
+    _parser.add_argument(
+        "--games", type=int, default=1000, help="self-play games to learn",
+    )
+    _parser.add_argument(
+        "--weights", default="ntuple.bin",
+        help="network file, created if missing",
+    )
+    _parser.add_argument(
+        "--tuples", type=int, choices=(4, 6), default=6,
+        help="tuple set of a new network (default: 6-tuples)",
+    )
+    _parser.add_argument(
+        "--learning-rate", type=float,
+        default=GN.Game2048TDTrainer.LEARNING_RATE,
+        help="TD learning rate, shared by the features of a board",
+    )
+    _parser.add_argument(
+        "--seed", type=int, default=None, help="self-play seed",
+    )
+    _parser.add_argument(
+        "--report-every", type=int, default=100,
+        help="games between two JSON progress lines",
+    )
+    return _parser.parse_args(argv)
+# end def
+
+
+def main(argv=None):
+    _args = parse_args(argv)
+    _network = GN.Game2048NTuple.open(
+        os.path.join(LAUNCH_DIR, _args.weights),
+        tuples=GN.TUPLES_6 if _args.tuples == 6 else GN.TUPLES_4,
+        writable=True, create=True,
+    )
+    _trainer = GN.Game2048TDTrainer(
+        _network, learning_rate=_args.learning_rate, seed=_args.seed,
+    )
+    _scores = []
+    _ranks = []
+    _started = time.perf_counter()
+    try:
+        for _game in range(1, _args.games + 1):
+            _score, _rank, _moves = _trainer.play_game()
+            _scores.append(_score)
+            _ranks.append(_rank)
+            if _game % _args.report_every and _game != _args.games:
+                continue
+            # end if
+            _network.flush()
+            sys.stdout.write(json.dumps(dict(
+                games=_game,
+                mean_score=round(sum(_scores) / len(_scores), 1),
+                max_score=max(_scores),
+                rate_2048=round(
+                    sum(_rank >= 11 for _rank in _ranks) / len(_ranks), 4
+                ),
+                elapsed=round(time.perf_counter() - _started, 1),
+            )) + "\n")
+            sys.stdout.flush()
+            _scores = []
+            _ranks = []
+        # end for
+    finally:
+        _network.flush()
+        _network.close()
+    # end try
+    return 0
+# end def
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+# end if